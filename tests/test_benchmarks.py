@@ -1,10 +1,29 @@
+import subprocess
+import sys
+import tracemalloc
+
 import pytest
+from multipledispatch import Dispatcher as MDDispatcher
 
+import unification.core as core
 from tests.utils import gen_long_chain
 from unification import assoc, isvar, reify, unify, var
+from unification.cache import ReifyCache
+from unification.core import _unify, isground, reify_many, stream_eval
+from unification.core import walk as walk_dispatch
+from unification.hamt import HAMTMap
+from unification.index import PatternIndex, TermStore
+from unification.lazy import reify_lazy
+from unification.match import Dispatcher as MatchDispatcher
+from unification.match import NoMatchError, freeze
+from unification.small import SmallMap
+from unification.term import Term
+from unification.unionfind import UnionFindMap
 from unification.utils import transitive_get as walk
 
 nesting_sizes = [10, 35, 300]
+state_sizes = [10, 1000, 10000]
+small_sizes = [1, 4, 8]
 
 
 def unify_stack(u, v, s):
@@ -85,3 +104,546 @@ def test_reify_chain_stack(size, benchmark):
 
     res = benchmark(reify_stack, form, {a_lv: "a"})
     assert res == term
+
+
+def gen_large_state(size, state_type=dict):
+    return state_type({var(): i for i in range(size)})
+
+
+def unify_chained(lvars, values, s):
+    for lv, val in zip(lvars, values):
+        s = unify(lv, val, s)
+    return s
+
+
+@pytest.mark.benchmark(group="unify_large_state")
+@pytest.mark.parametrize("size", state_sizes)
+def test_unify_large_state_dict(size, benchmark):
+    s = gen_large_state(size)
+    lvars = [var() for i in range(20)]
+
+    res = benchmark(unify_chained, lvars, range(20), s)
+    assert len(res) == size + 20
+
+
+@pytest.mark.benchmark(group="unify_large_state")
+@pytest.mark.parametrize("size", state_sizes)
+def test_unify_large_state_hamt(size, benchmark):
+    s = gen_large_state(size, HAMTMap)
+    lvars = [var() for i in range(20)]
+
+    res = benchmark(unify_chained, lvars, range(20), s)
+    assert len(res) == size + 20
+
+
+def gen_alias_chain(size, state_type=dict):
+    lvars = [var() for i in range(size)]
+    s = state_type()
+    for a_lv, b_lv in zip(lvars, lvars[1:]):
+        s = assoc(s, a_lv, b_lv)
+    s = assoc(s, lvars[-1], "a")
+    return lvars, s
+
+
+@pytest.mark.benchmark(group="reify_alias_chain")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_reify_alias_chain_dict(size, benchmark):
+    lvars, s = gen_alias_chain(size)
+
+    res = benchmark(reify, lvars, s)
+    assert res == ["a"] * size
+
+
+@pytest.mark.benchmark(group="reify_alias_chain")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_reify_alias_chain_unionfind(size, benchmark):
+    lvars, s = gen_alias_chain(size, UnionFindMap)
+
+    res = benchmark(reify, lvars, s)
+    assert res == ["a"] * size
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def unify_copying(u, v, s):
+    """Unify without the transactional `dict` overlay (i.e. copying on every binding)."""  # noqa: E501
+    return stream_eval(_unify(u, v, s))
+
+
+@pytest.mark.benchmark(group="unify_memory")
+@pytest.mark.parametrize("size", state_sizes)
+def test_unify_memory_transaction(size, benchmark):
+    s = gen_large_state(size)
+
+    # Every nesting level's generator keeps its own version of the state
+    # alive.
+    lvars = [var() for i in range(20)]
+    form = term = None
+    for i, lv in enumerate(lvars):
+        form, term = [lv, form], [i, term]
+
+    benchmark.extra_info["peak_memory"] = peak_memory(unify, form, term, s)
+    benchmark.extra_info["copying_peak_memory"] = peak_memory(
+        unify_copying, form, term, s
+    )
+
+    res = benchmark(unify, form, term, s)
+    assert len(res) == size + 20
+    assert unify_copying(form, term, s) == res
+
+
+def gen_many_results(lvars, state_type, n=1000):
+    form = tuple(lvars)
+    return [
+        unify(form, tuple(range(i, i + len(lvars))), state_type()) for i in range(n)
+    ]
+
+
+@pytest.mark.benchmark(group="small_substitution")
+@pytest.mark.parametrize("size", small_sizes)
+def test_small_substitution_dict(size, benchmark):
+    lvars = [var() for i in range(size)]
+
+    benchmark.extra_info["peak_memory"] = peak_memory(gen_many_results, lvars, dict)
+
+    res = benchmark(gen_many_results, lvars, dict)
+    assert all(len(s) == size for s in res)
+
+
+@pytest.mark.benchmark(group="small_substitution")
+@pytest.mark.parametrize("size", small_sizes)
+def test_small_substitution_smallmap(size, benchmark):
+    lvars = [var() for i in range(size)]
+
+    peak = peak_memory(gen_many_results, lvars, SmallMap)
+    benchmark.extra_info["peak_memory"] = peak
+
+    res = benchmark(gen_many_results, lvars, SmallMap)
+    assert all(len(s) == size for s in res)
+    assert peak < peak_memory(gen_many_results, lvars, dict)
+
+
+def gen_tuple_chain(size):
+    res = None
+    for i in range(size):
+        res = (i, res)
+    return res
+
+
+@pytest.mark.benchmark(group="unify_var_tuple_chain")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_unify_var_tuple_chain(size, benchmark):
+    """Unify a variable with a deep tuple at every level of a chain.
+
+    The time should grow linearly with `size`, since the deep tuples don't need
+    to be hashed.
+    """
+    lvars = [var() for i in range(size)]
+    form, term = None, None
+    for i, lv in enumerate(lvars):
+        form, term = (lv, form), (gen_tuple_chain(i), term)
+
+    res = benchmark(unify, form, term, {})
+    assert len(res) == size
+
+
+def gen_mixed_nodes(size):
+    lvars = [var() for i in range(size)]
+    nodes = [lvars[i] if i % 4 == 0 else (i, "a", (i,))[i % 4 - 1] for i in range(size)]
+    return nodes, {lv: i for i, lv in enumerate(lvars[::2])}
+
+
+def walk_nodes(walk_fn, nodes, s):
+    for n in nodes:
+        walk_fn(n, s)
+
+
+@pytest.mark.benchmark(group="dispatch_overhead")
+@pytest.mark.parametrize("size", state_sizes)
+def test_dispatch_overhead_multipledispatch(size, benchmark):
+    walk_md = MDDispatcher("walk")
+    for sig, func in walk_dispatch.funcs.items():
+        walk_md.add(sig, func)
+
+    nodes, s = gen_mixed_nodes(size)
+    benchmark(walk_nodes, walk_md, nodes, s)
+
+
+@pytest.mark.benchmark(group="dispatch_overhead")
+@pytest.mark.parametrize("size", state_sizes)
+def test_dispatch_overhead(size, benchmark):
+    nodes, s = gen_mixed_nodes(size)
+    benchmark(walk_nodes, walk_dispatch, nodes, s)
+
+
+def import_time(module):
+    """Return the cumulative import time of `module` in microseconds."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in res.stderr.splitlines()[1:]:
+        _, _, cumulative, name = (s.strip() for s in line.replace("|", ":").split(":"))
+        times[name] = int(cumulative)
+    return times
+
+
+@pytest.mark.benchmark(group="import_time")
+def test_import_time(benchmark):
+    times = benchmark.pedantic(import_time, args=("unification",), rounds=5)
+    benchmark.extra_info["import_time_us"] = times["unification"]
+
+    assert not {"multipledispatch", "toolz", "subprocess"} & set(times)
+
+
+def gen_term_chain(size, leaf):
+    res = leaf
+    for i in range(size):
+        res = Term("f", i, res)
+    return res
+
+
+@pytest.mark.benchmark(group="isground")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_isground_tuple(size, benchmark):
+    term = gen_tuple_chain(size)
+    assert benchmark(isground, (term, var()), {var(): 1}) is False
+
+
+@pytest.mark.benchmark(group="isground")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_isground_term(size, benchmark):
+    x = var()
+    term = gen_term_chain(size, x)
+    assert benchmark(isground, term, {var(): 1}) is False
+
+
+def gen_ground_facts(size, n=10):
+    # Facts that only differ in their deepest elements
+    facts = []
+    for i in range(n):
+        fact = (i,)
+        for j in range(size):
+            fact = (j, str(j), fact)
+        facts.append(fact)
+    return facts
+
+
+def unify_facts(pattern, facts):
+    return [unify(pattern, (1, fact), {}) for fact in facts]
+
+
+@pytest.mark.benchmark(group="unify_ground_mismatch")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_unify_ground_mismatch(size, benchmark):
+    facts = gen_ground_facts(size)
+    pattern = (var(), facts[0])
+
+    res = benchmark(unify_facts, pattern, facts)
+    assert sum(s is not False for s in res) == 1
+
+
+@pytest.mark.benchmark(group="unify_ground_mismatch")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_unify_ground_mismatch_fingerprints(size, benchmark, monkeypatch):
+    monkeypatch.setattr(core, "max_fingerprints", 10000)
+    monkeypatch.setattr(core, "_fingerprints", {})
+
+    facts = gen_ground_facts(size)
+    pattern = (var(), facts[0])
+
+    res = benchmark(unify_facts, pattern, facts)
+    assert sum(s is not False for s in res) == 1
+
+
+def gen_document(size, x):
+    """Generate a document with `size` records, only one of which contains `x`."""
+    return {
+        f"record_{i}": {"id": i, "tags": ["a", "b"], "value": x if i == 0 else (i,)}
+        for i in range(size)
+    }
+
+
+@pytest.mark.benchmark(group="reify_mostly_ground")
+@pytest.mark.parametrize("size", state_sizes)
+def test_reify_mostly_ground(size, benchmark):
+    x = var()
+    doc = gen_document(size, x)
+
+    res = benchmark(reify, doc, {x: 1})
+    assert res["record_0"]["value"] == 1
+    assert all(res[k] is doc[k] for k in list(doc)[1:])
+
+
+def gen_templates(size, lvars):
+    return [
+        {"name": lvars[i % len(lvars)], "body": [(j, str(j)) for j in range(size)]}
+        for i in range(20)
+    ]
+
+
+def gen_evolving_states(lvars, n=20):
+    # Each state only changes the binding of one of the variables
+    s = {lv: i for i, lv in enumerate(lvars)}
+    states = []
+    for i in range(n):
+        s = dict(s)
+        s[lvars[0]] = i
+        states.append(s)
+    return states
+
+
+def reify_templates(reify_fn, templates, states):
+    return [reify_fn(t, s) for s in states for t in templates]
+
+
+@pytest.mark.benchmark(group="reify_templates")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_reify_templates(size, benchmark):
+    lvars = [var() for i in range(10)]
+    templates = gen_templates(size, lvars)
+    states = gen_evolving_states(lvars)
+
+    benchmark(reify_templates, reify, templates, states)
+
+
+@pytest.mark.benchmark(group="reify_templates")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_reify_templates_cache(size, benchmark):
+    lvars = [var() for i in range(10)]
+    templates = gen_templates(size, lvars)
+    states = gen_evolving_states(lvars)
+    cache = ReifyCache()
+
+    res = benchmark(reify_templates, cache.reify, templates, states)
+    assert res == reify_templates(reify, templates, states)
+
+
+def gen_handler_outputs(size, n=100):
+    """Generate `n` output terms that share variables bound to large values."""
+    lvars = [var() for i in range(10)]
+    s = {
+        lv: [(j, str(j)) for j in range(size)] + [lvars[i + 1]]
+        for i, lv in enumerate(lvars[:-1])
+    }
+    s[lvars[-1]] = "end"
+    terms = [
+        {"handler": i, "output": (lvars[i % 10], lvars[(i + 3) % 10])} for i in range(n)
+    ]
+    return terms, s
+
+
+def reify_each(terms, s):
+    return [reify(t, s) for t in terms]
+
+
+@pytest.mark.benchmark(group="reify_many")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_reify_many_loop(size, benchmark):
+    terms, s = gen_handler_outputs(size)
+    benchmark(reify_each, terms, s)
+
+
+@pytest.mark.benchmark(group="reify_many")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_reify_many(size, benchmark):
+    terms, s = gen_handler_outputs(size)
+    res = benchmark(reify_many, terms, s)
+    assert res == reify_each(terms, s)
+
+
+def read_record(reify_fn, doc, s):
+    return reify_fn(doc, s)["record_0"]["value"]
+
+
+@pytest.mark.benchmark(group="reify_partial_access")
+@pytest.mark.parametrize("size", state_sizes)
+def test_reify_partial_access(size, benchmark):
+    x = var()
+    doc = gen_document(size, x)
+    assert benchmark(read_record, reify, doc, {x: 1}) == 1
+
+
+@pytest.mark.benchmark(group="reify_partial_access")
+@pytest.mark.parametrize("size", state_sizes)
+def test_reify_partial_access_lazy(size, benchmark):
+    x = var()
+    doc = gen_document(size, x)
+    assert benchmark(read_record, reify_lazy, doc, {x: 1}) == 1
+
+
+def gen_event_dispatcher(size):
+    d = MatchDispatcher("d")
+    x, y, z = var(), var(), var()
+    for i in range(size):
+        d.add(("event", i, x), lambda *args: args[1])
+    d.add(("event", y, z), lambda *args: None)
+    return d
+
+
+def resolve_linear(d, args):
+    frozen_args = freeze(args)
+    for signature in d.ordering:
+        s = unify(frozen_args, signature)
+        if s is not False:
+            return d.funcs[signature], s
+
+
+@pytest.mark.benchmark(group="match_resolve")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_resolve_linear(size, benchmark):
+    d = gen_event_dispatcher(size)
+    func, _ = benchmark(resolve_linear, d, ("event", size - 1, "a"))
+    assert func("event", 1, "a") == 1
+
+
+def resolve_uncached(d, args):
+    signature, s = d._resolve(freeze(args))
+    return d.funcs[signature], s
+
+
+@pytest.mark.benchmark(group="match_resolve")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_resolve(size, benchmark):
+    d = gen_event_dispatcher(size)
+    func, _ = benchmark(resolve_uncached, d, ("event", size - 1, "a"))
+    assert func("event", 1, "a") == 1
+
+
+@pytest.mark.benchmark(group="match_resolve")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_resolve_cached(size, benchmark):
+    d = gen_event_dispatcher(size)
+    func, _ = benchmark(d.resolve, ("event", size - 1, "a"))
+    assert func("event", 1, "a") == 1
+
+
+@pytest.mark.benchmark(group="match_resolve_ground")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_resolve_ground_uncached(size, benchmark):
+    d = gen_event_dispatcher(size)
+    d.add(("event", size - 1, "a"), lambda *args: "ground")
+    func, _ = benchmark(resolve_uncached, d, ("event", size - 1, "a"))
+    assert func() == "ground"
+
+
+@pytest.mark.benchmark(group="match_resolve_ground")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_resolve_ground(size, benchmark):
+    d = gen_event_dispatcher(size)
+    d.add(("event", size - 1, "a"), lambda *args: "ground")
+    func, _ = benchmark(d.resolve, ("event", size - 1, "a"))
+    assert func() == "ground"
+
+
+def gen_alert_rules(size):
+    x, y = var(), var()
+    rules = [(("metric", f"host-{i}", x), i) for i in range(size)]
+    rules.append((("metric", y, 100), -1))
+    return rules
+
+
+def match_linear(rules, term):
+    res = []
+    for pattern, payload in rules:
+        s = unify(pattern, term, {})
+        if s is not False:
+            res.append((payload, s))
+    return res
+
+
+def match_index(index, term):
+    return list(index.matches(term))
+
+
+@pytest.mark.benchmark(group="pattern_index")
+@pytest.mark.parametrize("size", state_sizes)
+def test_pattern_index_linear(size, benchmark):
+    rules = gen_alert_rules(size)
+    res = benchmark(match_linear, rules, ("metric", "host-1", 100))
+    assert [payload for payload, _ in res] == [1, -1]
+
+
+@pytest.mark.benchmark(group="pattern_index")
+@pytest.mark.parametrize("size", state_sizes)
+def test_pattern_index(size, benchmark):
+    index = PatternIndex()
+    for pattern, payload in gen_alert_rules(size):
+        index.add(pattern, payload)
+    res = benchmark(match_index, index, ("metric", "host-1", 100))
+    assert [payload for payload, _ in res] == [1, -1]
+
+
+fact_sizes = [1000, 100000]
+
+
+def gen_facts(size):
+    return [("edge", i % 1000, i) for i in range(size)]
+
+
+def find_linear(facts, pattern):
+    res = []
+    for fact in facts:
+        s = unify(pattern, fact, {})
+        if s is not False:
+            res.append(s)
+    return res
+
+
+def find_store(store, pattern):
+    return list(store.find(pattern))
+
+
+@pytest.mark.benchmark(group="term_store")
+@pytest.mark.parametrize("size", fact_sizes)
+def test_term_store_linear(size, benchmark):
+    x = var()
+    facts = gen_facts(size)
+    res = benchmark(find_linear, facts, ("edge", 7, x))
+    assert len(res) == size // 1000
+
+
+@pytest.mark.benchmark(group="term_store")
+@pytest.mark.parametrize("size", fact_sizes)
+def test_term_store(size, benchmark):
+    x = var()
+    store = TermStore(gen_facts(size))
+    res = benchmark(find_store, store, ("edge", 7, x))
+    assert len(res) == size // 1000
+
+
+def miss_eager(d, args):
+    # Resolve without the caches and format the error message right away
+    signature, _ = d._resolve(freeze(args))
+    if signature is None:
+        return str(NoMatchError(d.ordering, args))
+
+
+def miss_default(d, args):
+    return d(*args)
+
+
+@pytest.mark.benchmark(group="match_miss")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_miss_eager(size, benchmark):
+    d = gen_event_dispatcher(size)
+    assert benchmark(miss_eager, d, ("other", 1, 2)).startswith("No match")
+
+
+@pytest.mark.benchmark(group="match_miss")
+@pytest.mark.parametrize("size", nesting_sizes)
+def test_match_miss(size, benchmark):
+    d = gen_event_dispatcher(size)
+    d.default = lambda *args: None
+    assert benchmark(miss_default, d, ("other", 1, 2)) is None
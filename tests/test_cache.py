@@ -0,0 +1,80 @@
+from unification import var
+from unification.cache import ReifyCache
+from unification.core import reify
+
+
+def test_ReifyCache():
+    x, y, z = var(), var(), var()
+
+    cache = ReifyCache(maxsize=2)
+    assert len(cache) == 0
+
+    t = (x, [1, 2], {"a": (y,)})
+
+    res = cache.reify(t, {x: 1})
+    assert res == (1, [1, 2], {"a": (y,)})
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Unrelated bindings don't invalidate the entry
+    assert cache.reify(t, {x: 1, z: 3}) is res
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Neither do bindings to the same objects in other substitutions
+    z_1 = (z, 1)
+    s = {x: z_1, z: 2}
+    assert cache.reify(t, s) == (((2, 1)), [1, 2], {"a": (y,)})
+    assert cache.reify(t, {**s, var(): 1}) is cache.reify(t, s)
+    assert cache.hits == 3
+
+    # Changing a variable's value does, even when it's only reached through
+    # another variable's value, or when the new value is merely equal
+    assert cache.reify(t, {x: z_1, z: 3}) == ((3, 1), [1, 2], {"a": (y,)})
+    assert cache.reify(t, {x: (z, 1), z: 3}) == ((3, 1), [1, 2], {"a": (y,)})
+    assert cache.reify(t, {x: 1, y: 2}) == (1, [1, 2], {"a": (2,)})
+    assert cache.reify(t, {x: 1, y: 2.0}) == (1, [1, 2], {"a": (2.0,)})
+    assert type(cache.reify(t, {x: 1, y: 2.0})[2]["a"][0]) is float
+    assert cache.misses == 6
+
+    # Ground terms are always valid
+    g = (1, [2])
+    assert cache.reify(g, {x: 1}) is g
+    assert cache.reify(g, {}) is g
+    assert len(cache) == 2
+
+    # Least recently used entries are evicted
+    u = [z]
+    assert cache.reify(u, {z: 1}) == [1]
+    assert len(cache) == 2
+    misses = cache.misses
+    cache.reify(g, {})
+    cache.reify(u, {z: 1})
+    assert cache.misses == misses
+    cache.reify(t, {x: 1})
+    assert cache.misses == misses + 1
+
+    assert repr(cache) == (
+        f"ReifyCache(maxsize=2, hits={cache.hits}, misses={cache.misses})"
+    )
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.reify(t, {x: 1}) == reify(t, {x: 1})
+
+
+def test_ReifyCache_types():
+    x = var()
+
+    cache = ReifyCache()
+    t = [x]
+
+    res = cache.reify(t, {x: (2,)})
+    assert cache.reify(t, {x: (2.0,)}) == [(2.0,)]
+    assert type(cache.reify(t, {x: (2.0,)})[0][0]) is float
+
+    assert cache.reify(t, {x: [True]}) == [[True]]
+    assert type(cache.reify(t, {x: [1]})[0][0]) is int
+    assert type(cache.reify(t, {x: [True]})[0][0]) is bool
+
+    s = {x: (2,)}
+    assert cache.reify(t, s) == res
+    assert cache.reify(t, s) is cache.reify(t, dict(s))
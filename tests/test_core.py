@@ -1,12 +1,32 @@
 import sys
 from collections import OrderedDict
+from collections.abc import Mapping
 from types import MappingProxyType
 
 import pytest
 
-from tests.utils import gen_long_chain
-from unification import var
-from unification.core import assoc, isground, reify, unground_lvars, unify
+import unification.core as core
+from tests.utils import gen_long_chain, isolate_dispatcher
+from unification import var, variables
+from unification.core import (
+    LayeredMap,
+    ReifyChildren,
+    UnifyPairs,
+    _reify,
+    _unify,
+    assoc,
+    compact,
+    fingerprint,
+    isground,
+    reify,
+    reify_many,
+    stream_eval,
+    unground_lvars,
+    unify,
+)
+from unification.small import SmallMap
+from unification.trail import TrailMap
+from unification.unionfind import UnionFindMap
 from unification.utils import freeze
 
 
@@ -96,6 +116,171 @@ def test_unify():
     assert unify(x, y, {y: z}) == {y: z, x: z}
 
 
+def test_unify_dict_transaction():
+    x, y, z = var(), var(), var()
+
+    s = {x: 1}
+    assert unify((x, 2), (1, 2), s) is s
+    assert unify(x, 2, s) is False
+
+    res = unify((x, y, [z]), (1, 2, [y]), s)
+    assert res == {x: 1, y: 2, z: 2}
+    assert s == {x: 1}
+
+    class CountingDict(dict):
+        copies = 0
+
+        def copy(self):
+            CountingDict.copies += 1
+            return CountingDict(self)
+
+    # `dict` subclasses are still extended through `assoc`
+    res = unify((y, z), (1, 2), CountingDict(s))
+    assert type(res) is CountingDict
+    assert res == {x: 1, y: 1, z: 2}
+    assert CountingDict.copies == 2
+
+
+def test_unify_dict_overrides(monkeypatch):
+    isolate_dispatcher(monkeypatch, _unify)
+    isolate_dispatcher(monkeypatch, assoc)
+
+    x, y = var(), var()
+
+    class Box(object):
+        def __init__(self, a):
+            self.a = a
+
+    @_unify.register(Box, Box, dict)
+    def _unify_Box(u, v, s):
+        yield _unify(u.a, v.a, s)
+
+    assocs = []
+
+    @assoc.register(dict, object, object)
+    def assoc_dict(s, u, v):
+        assocs.append(u)
+        s = s.copy()
+        s[u] = v
+        return s
+
+    assert unify(Box(x), Box(1), {}) == {x: 1}
+    assert unify((Box(x), y), (Box(1), 2), {}) == {x: 1, y: 2}
+    assert assocs == [x, x, y]
+
+    s = {y: 2}
+    assert unify(Box(x), Box(1), s, delta=True) == {x: 1}
+    assert unify((Box(x), y), (Box(y), 2), s, delta=True, compact=True) == {x: 2}
+    assert s == {y: 2}
+
+
+def test_unify_Mapping_extension(monkeypatch):
+    isolate_dispatcher(monkeypatch, _unify)
+
+    x, y = var(), var()
+
+    class Box(object):
+        def __init__(self, a):
+            self.a = a
+
+    # Extensions can extend the substitutions they're given like a `dict`
+    @_unify.register(Box, int, Mapping)
+    def _unify_Box(u, v, s):
+        s = s.copy()
+        s[u.a] = v
+        return s
+
+    s = {y: 2}
+    assert unify(Box(x), 1, s) == {x: 1, y: 2}
+    assert unify((y, Box(x)), (2, 1), s, delta=True) == {x: 1}
+    assert unify((Box(x), x), (1, 2), s) is False
+    assert s == {y: 2}
+
+
+def test_LayeredMap():
+    x, y, z = var(), var(), var()
+
+    base = {x: 1, y: z}
+    s = LayeredMap(base)
+    assert s == base
+    assert len(s) == 2
+    assert repr(s) == f"LayeredMap({base!r}, {{}})"
+
+    s1 = assoc(s, z, 2)
+    assert type(s1) is LayeredMap
+    assert type(s.copy()) is LayeredMap
+    assert s.copy().base is base
+    assert s1.base is base
+    assert s1.bindings == {z: 2}
+    assert s.bindings == {}
+    assert s1 == {x: 1, y: z, z: 2}
+    assert list(s1) == [z, x, y]
+
+    s2 = assoc(s1, x, 3)
+    assert len(s2) == 3
+    assert s2[x] == 3
+    assert s2.materialize() == {x: 3, y: z, z: 2}
+    assert base == {x: 1, y: z}
+    assert s.materialize() is base
+
+    s3 = unify((x, y), (1, 2), LayeredMap(base))
+    assert s3.base is base
+    assert s3.bindings == {z: 2}
+    assert reify((x, y, z), s3) == (1, 2, 2)
+
+    s4 = unify(z, 2, LayeredMap(s3))
+    assert s4.base is s3
+    assert s4.bindings == {}
+    assert s4 == s3
+
+
+def test_unify_delta():
+    x, y, z = var(), var(), var()
+
+    base = {x: 1, y: z}
+    assert unify((x, y), (1, 2), base, delta=True) == {z: 2}
+    assert unify((x, y), (2, 2), base, delta=True) is False
+    assert unify(x, 1, base, delta=True) == {}
+    assert unify(base, base, base, delta=True) == {}
+    assert unify((1, x), (y, 2), delta=True) == {y: 1, x: 2}
+    assert base == {x: 1, y: z}
+
+
+def test_compact():
+    x, y, z, w = var(), var(), var(), var()
+
+    s = {x: y, y: (1, z), z: 2, w: x}
+    cs = compact(s)
+    assert cs == {x: (1, 2), y: (1, 2), z: 2, w: (1, 2)}
+    assert type(cs) is dict
+    assert s == {x: y, y: (1, z), z: 2, w: x}
+    assert compact({x: y, y: z}) == {x: z, y: z}
+    assert compact({}) == {}
+
+    assert unify((x, y), (y, [z]), {z: w}, compact=True) == {x: [w], y: [w], z: w}
+    assert unify((x, y), (y, [z]), {z: 1}, compact=True, delta=True) == {
+        x: [1],
+        y: [1],
+    }
+    assert unify(x, 1, {x: 2}, compact=True) is False
+    assert unify(x, x, {x: y, y: 1}, compact=True) == {x: 1, y: 1}
+    assert unify((x, 1), (y, 1), compact=True) == {x: y}
+
+
+@pytest.mark.parametrize("state_type", [OrderedDict, SmallMap, TrailMap, UnionFindMap])
+def test_compact_type(state_type):
+    x, y, z = var(), var(), var()
+
+    s = state_type({x: y, y: (1, z), z: 2})
+    cs = compact(s)
+    assert type(cs) is state_type
+    assert cs == {x: (1, 2), y: (1, 2), z: 2}
+
+    cs = unify((x, y), (y, [z]), state_type({z: 1}), compact=True)
+    assert type(cs) is state_type
+    assert cs == {x: [1], y: [1], z: 1}
+
+
 def test_unify_slice():
     x, y = var(), var()
     assert unify(slice(1), slice(1), {}) == {}
@@ -256,6 +441,189 @@ def test_unify_recursion_limit():
     assert s[a_lv] == "a"
 
 
+def test_unify_no_term_hashing():
+    class HashCounter(object):
+        hashes = 0
+
+        def __hash__(self):
+            HashCounter.hashes += 1
+            return 0
+
+    lvars = [var() for i in range(12)]
+
+    # Every variable is unified with a deep tuple, which would be hashed by
+    # `walk` and `isvar` at every level if they used membership checks.
+    form = term = HashCounter()
+    for lv in lvars:
+        form, term = (lv, form), (term, term)
+
+    s = unify(form, term, {})
+    assert s is not False
+    assert reify(form, s) == term
+    assert HashCounter.hashes == 0
+
+    with variables("a"):
+        assert unify(("a", [1]), (1, ["a"]), {}) is False
+
+    s = unify((lvars[0], [1]), (term, [1]), {})
+    assert s == {lvars[0]: term}
+    assert HashCounter.hashes == 0
+
+
+def test_builtins_without_generators(monkeypatch):
+    import unification.core
+
+    def stream_eval(*args, **kwargs):
+        raise AssertionError("stream_eval was used")
+
+    monkeypatch.setattr(unification.core, "stream_eval", stream_eval)
+
+    x, y, z = var(), var(), var()
+    u = (1, [x, {2: y}], {3, z}, slice(1, x), iter([x]))
+    v = (1, [2, {2: (3,)}], {3, 4}, slice(1, 2), iter([2]))
+    s = unify(u, v, {})
+    assert s == {x: 2, y: (3,), z: 4}
+
+    e = (1, [x, {2: y, x: ()}], {3, z}, slice(1, x), OrderedDict([(x, y)]))
+    assert reify(e, s) == (
+        1,
+        [2, {2: ()}],
+        {3, 4},
+        slice(1, 2),
+        OrderedDict([(2, (3,))]),
+    )
+    assert list(reify(iter([x, y]), s)) == [2, (3,)]
+
+
+@pytest.mark.parametrize("depth", [0, 2, 50, 10000])
+def test_max_recursive_depth(depth, monkeypatch):
+    import unification.core
+
+    monkeypatch.setattr(unification.core, "max_recursive_depth", depth)
+
+    x, y = var(), var()
+
+    u = (1, [x, {2: y}], {3}, slice(1, x), (((x,),),))
+    v = (1, [2, {2: (3,)}], {3}, slice(1, 2), (((2,),),))
+    s = unify(u, v, {})
+    assert s == {x: 2, y: (3,)}
+    assert reify(u, s) == v
+
+    b = gen_long_chain("a", 300)
+    b_var = gen_long_chain(x, 300)
+
+    r_limit = sys.getrecursionlimit()
+    try:
+        sys.setrecursionlimit(200)
+        s = unify(b, b_var, {})
+        res = reify(b_var, s)
+    finally:
+        sys.setrecursionlimit(r_limit)
+
+    assert s == {x: "a"}
+    assert res == b
+
+
+def test_recursion_limit_restart_iterators():
+    import inspect
+
+    x, y = var(), var()
+
+    def unify_iters():
+        u = iter([x, gen_long_chain(y, 40)])
+        v = iter([1, gen_long_chain(2, 40)])
+        return unify(u, v, {})
+
+    def reify_iter():
+        return list(reify(iter([x, gen_long_chain(y, 40)]), {x: 1, y: 2}))
+
+    # Run out of stack part-way through the recursive attempts, after the
+    # first elements of the iterators were read.
+    depth = len(inspect.stack(0))
+    r_limit = sys.getrecursionlimit()
+    results = []
+    try:
+        for headroom in range(10, 150):
+            sys.setrecursionlimit(depth + headroom)
+            try:
+                results.append((unify_iters(), reify_iter()))
+            except RecursionError:
+                pass
+    finally:
+        sys.setrecursionlimit(r_limit)
+
+    assert results
+    for s, res in results:
+        assert s == {x: 1, y: 2}
+        assert res == [1, gen_long_chain(2, 40)]
+
+
+class Cons(object):
+    def __init__(self, car, cdr):
+        self.car = car
+        self.cdr = cdr
+
+    def __eq__(self, other):
+        return type(self) == type(other) and (self.car, self.cdr) == (
+            other.car,
+            other.cdr,
+        )
+
+
+@_unify.register(Cons, Cons, Mapping)
+@UnifyPairs
+def _unify_Cons(u, v, s):
+    return [(u.car, v.car), (u.cdr, v.cdr)]
+
+
+@_reify.register(Cons, Mapping)
+@ReifyChildren
+def _reify_Cons(o, s):
+    return (o.car, o.cdr), lambda args: Cons(*args)
+
+
+def test_worklist_protocol(monkeypatch):
+    isolate_dispatcher(monkeypatch, _unify)
+
+    x, y = var(), var()
+
+    assert _unify_Cons.__name__ == "_unify_Cons"
+
+    assert unify(Cons(1, x), Cons(1, [2]), {}) == {x: [2]}
+    assert unify(Cons(1, x), Cons(2, [2]), {}) is False
+    assert unify([Cons(x, (y,))], [Cons(1, (2,))], {}) == {x: 1, y: 2}
+    assert reify([Cons(x, (y,))], {x: 1, y: 2}) == [Cons(1, (2,))]
+
+    # The generator-based protocol is still supported
+    assert stream_eval(_unify(Cons(x, 1), Cons(2, y), {})) == {x: 2, y: 1}
+    assert stream_eval(_unify(Cons(x, 1), Cons(2, 2), {x: 3})) is False
+    assert stream_eval(_reify(Cons(x, 1), {x: 2})) == Cons(2, 1)
+    assert unground_lvars(Cons(x, [y]), {x: 1}) == {y}
+    assert not isground(Cons(x, [y]), {x: 1})
+    assert isground(Cons(x, [y]), {x: 1, y: 2})
+
+    # Implementations that return `False` and deep terms
+    @_unify.register(Cons, tuple, Mapping)
+    @UnifyPairs
+    def _unify_Cons_tuple(u, v, s):
+        if len(v) != 2:
+            return False
+        return [(u.car, v[0]), (u.cdr, v[1])]
+
+    assert unify(Cons(x, y), (1, 2), {}) == {x: 1, y: 2}
+    assert unify(Cons(x, y), (1, 2, 3), {}) is False
+    assert unify([Cons(x, y)], [(1, 2, 3)], {}) is False
+    assert stream_eval(_unify(Cons(x, y), (1,), {})) is False
+
+    u = v = None
+    for i in range(sys.getrecursionlimit() + 10):
+        u, v = Cons(x if i == 0 else i, u), Cons(i, v)
+
+    s = unify(u, v, {})
+    assert s == {x: 0}
+    assert reify(u, s) is not u
+
+
 def test_unify_freeze():
 
     # These will sometimes be in different orders after conversion to
@@ -268,3 +636,112 @@ def test_unify_freeze():
     v = freeze({"name": "Bob", "debit": 100})
 
     assert unify(u, v, {}) == {a: "Bob", b: 100}
+
+
+def test_fingerprint(monkeypatch):
+    x = var()
+
+    monkeypatch.setattr(core, "max_fingerprints", 100)
+    monkeypatch.setattr(core, "_fingerprints", {})
+
+    t = (1, ("a", (None, 2.0)))
+    assert fingerprint(t) == fingerprint((1, ("a", (None, 2.0))))
+    assert fingerprint(t) == fingerprint((1.0, ("a", (None, 2))))
+    assert fingerprint(t) != fingerprint((1, ("a", (None, 3))))
+    assert fingerprint(()) is not None
+    assert fingerprint((1, ("a", (x, 2)))) is None
+    assert fingerprint((1, ["a"])) is None
+    assert fingerprint((1, object())) is None
+
+    assert id(t) in core._fingerprints
+    assert id(t[1][1]) in core._fingerprints
+
+    for i in range(200):
+        fingerprint((i,))
+    assert len(core._fingerprints) == 100
+
+    assert unify((x, t), (1, (1, ("a", (None, 2)))), {}) == {x: 1}
+    assert unify((x, t), (1, (1, ("a", (None, 3)))), {}) is False
+    assert unify((x, t), (1, (1, ("a", (x, 2)))), {}) is False
+    y = var()
+    assert unify((x, t), (1, (1, ("a", (y, 2.0)))), {}) == {x: 1, y: None}
+    assert unify((x, t), (1, [1, ("a", (None, 2))]), {}) is False
+
+    # Deep tuples that `==` can't compare
+    u = v = None
+    for i in range(sys.getrecursionlimit() + 10):
+        u, v = (i, u), (i, v)
+
+    assert unify(u, v, {}) == {}
+    assert unify((1, u), (2, v), {}) is False
+
+
+@pytest.mark.parametrize("depth", [0, 2, 50])
+def test_reify_copy_on_write(depth, monkeypatch):
+    monkeypatch.setattr(core, "max_recursive_depth", depth)
+
+    x, y, z = var(), var(), var()
+    s = {x: 1, y: (2, z)}
+
+    ground = (1, [2, {"a": (3,)}], {4}, slice(1, 2))
+    e = [ground, (x, ground), {"b": [y], "c": ground}, OrderedDict(d=ground)]
+
+    assert reify(ground, s) is ground
+    assert reify(e[3], s) is e[3]
+
+    r = reify(e, s)
+    assert r == [
+        ground,
+        (1, ground),
+        {"b": [(2, z)], "c": ground},
+        OrderedDict(d=ground),
+    ]
+    assert r is not e
+    assert r[0] is ground
+    assert r[1] is not e[1]
+    assert r[1][1] is ground
+    assert r[2] is not e[2]
+    assert r[2]["c"] is ground
+    assert r[3] is e[3]
+
+    # A variable that's bound to a ground term is still a change
+    t = (3,)
+    assert reify((x, [z]), {x: t, z: 4}) == (t, [4])
+    assert reify({1: x}, {x: t}) == {1: t}
+
+    # Iterators are consumed by reification, so they're always rebuilt
+    it = iter([1, 2])
+    r = reify(it, s)
+    assert r is not it
+    assert list(r) == [1, 2]
+
+    assert stream_eval(_reify(ground, s)) is ground
+    assert stream_eval(_reify((x, ground), s))[1] is ground
+
+
+@pytest.mark.parametrize("depth", [0, 2, 50])
+def test_reify_many(depth, monkeypatch):
+    monkeypatch.setattr(core, "max_recursive_depth", depth)
+
+    x, y, z = var(), var(), var()
+    s = {x: [y, 2], y: (z, 3), z: 4}
+
+    terms = [x, (1, x), {"a": [x, y]}, z, (5,), iter([y])]
+    res = reify_many(terms, s)
+
+    assert res[:5] == [reify(t, s) for t in terms[:5]]
+    assert list(res[5]) == [(4, 3)]
+    assert res[1][1] is res[0]
+    assert res[2]["a"][0] is res[0]
+    assert res[2]["a"][1] is res[0][0]
+    assert res[4] is terms[4]
+
+    assert reify_many([], s) == []
+    assert reify_many((x, y), {}) == [x, y]
+    assert reify_many(iter([x, z]), {z: 1}) == [x, 1]
+
+    b = gen_long_chain(x, sys.getrecursionlimit() + 10)
+    for r in reify_many([b, b], {x: 1}):
+        while isinstance(r[1], list):
+            r = r[1]
+        assert r[1] == 1
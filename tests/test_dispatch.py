@@ -0,0 +1,142 @@
+import subprocess
+import sys
+from collections.abc import Mapping
+
+import pytest
+from multipledispatch.dispatcher import MDNotImplementedError
+
+from unification.core import _unify, compact, isground, project, reify, unify, walk
+from unification.dispatch import Dispatcher, dispatch
+
+
+def test_Dispatcher_cache():
+    d = Dispatcher("d")
+    d.add((object, Mapping), lambda u, s: "object")
+
+    assert d(1, {}) == "object"
+    assert d.resolve((int, dict))(1, {}) == "object"
+    assert (int, dict) in d._cache
+
+    # Adding an implementation invalidates the cache
+    d.add((int, Mapping), lambda u, s: "int")
+    assert (int, dict) not in d._cache
+    assert d(1, {}) == "int"
+    assert d(True, {}) == "int"
+    assert d("a", {}) == "object"
+
+    @d.register(str, dict)
+    def d_str(u, s):
+        return "str"
+
+    assert d("a", {}) == "str"
+
+    with pytest.raises(NotImplementedError, match="<int>"):
+        d(1)
+
+    with pytest.raises(NotImplementedError, match="<int>"):
+        d.resolve((int,))
+
+
+def test_Dispatcher_lazy():
+    d = Dispatcher("d")
+    d.add(((int, str), Mapping), lambda u, s: "int or str")
+
+    assert set(d.funcs) == {(int, Mapping), (str, Mapping)}
+    assert d.dispatch(int, Mapping) is d.funcs[(int, Mapping)]
+    assert d._dispatcher is None
+
+    assert d(1, {}) == "int or str"
+    assert d._dispatcher is not None
+    assert set(d.ordering) == {(int, Mapping), (str, Mapping)}
+
+    d.add((object, Mapping), lambda u, s: "object")
+    assert d._dispatcher is None
+    assert d(1.0, {}) == "object"
+
+    assert repr(d) == "<dispatched d>"
+
+    with pytest.raises(TypeError):
+        d.add((1,), lambda u: u)
+
+
+def test_Dispatcher_MDNotImplementedError():
+    d = Dispatcher("d")
+    calls = []
+
+    @d.register(object)
+    def d_object(u):
+        calls.append(object)
+        return "object"
+
+    @d.register(int)
+    def d_int(u):
+        calls.append(int)
+        raise MDNotImplementedError()
+
+    assert d(1) == "object"
+    assert calls == [int, object]
+
+    @d.register(bool)
+    def d_bool(u):
+        raise MDNotImplementedError()
+
+    d.add((object,), d_bool)
+
+    with pytest.raises(NotImplementedError, match="none completed"):
+        d(True)
+
+
+def test_dispatch():
+    namespace = dict()
+
+    @dispatch(int, namespace=namespace)
+    def f(x):
+        return x + 1
+
+    @dispatch(float, namespace=namespace)
+    def f(x):  # noqa: F811
+        return x - 1
+
+    assert namespace["f"] is f
+    assert isinstance(f, Dispatcher)
+    assert f(1) == 2
+    assert f(1.0) == 0.0
+
+    assert isinstance(_unify, Dispatcher)
+    assert isinstance(walk, Dispatcher)
+
+
+def test_Dispatcher_doc():
+    d = Dispatcher("d", doc="Dispatch on `u`.")
+
+    @d.register(int)
+    def d_int(u):
+        """Handle an `int`."""
+        return u
+
+    d.add((object,), lambda u: u)
+
+    assert "Dispatch on `u`." in d.__doc__
+    assert "Inputs: <int>" in d.__doc__
+    assert "Handle an `int`." in d.__doc__
+    assert "Other signatures:\n    object" in d.__doc__
+
+    for f in (unify, reify, walk, compact, project, isground):
+        assert f.__doc__.strip()
+        assert f.funcs[next(iter(f.funcs))].__doc__.strip() in f.__doc__
+
+    assert "Find substitution so that u == v while satisfying s." in unify.__doc__
+
+
+def test_lazy_imports():
+    code = (
+        "import sys; import unification; "
+        "print(sorted(m for m in ('multipledispatch', 'toolz', 'subprocess') "
+        "if m in sys.modules)); "
+        "from unification import unify, var; unify([var()], [1], {}); "
+        "print(unification.__version__ is not None)"
+    )
+    res = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert res.stdout.split() == ["[]", "True"]
@@ -0,0 +1,138 @@
+import pytest
+
+from unification import var
+from unification.core import assoc, compact, isground, reify, unground_lvars, unify
+from unification.hamt import HAMTMap
+
+
+class Collider(object):
+    """An object with a fixed hash value."""
+
+    def __init__(self, name, h=0):
+        self.name = name
+        self.h = h
+
+    def __hash__(self):
+        return self.h
+
+    def __eq__(self, other):
+        return type(self) == type(other) and self.name == other.name
+
+    def __repr__(self):
+        return f"Collider({self.name!r})"
+
+
+def test_HAMTMap_basic():
+    s = HAMTMap()
+    assert len(s) == 0
+    assert dict(s) == {}
+
+    s1 = s.set("a", 1)
+    assert s1 is not s
+    assert len(s) == 0
+    assert len(s1) == 1
+    assert s1["a"] == 1
+    assert "a" in s1
+    assert "b" not in s1
+    assert s1.get("b") is None
+    assert s1.get("b", 2) == 2
+
+    with pytest.raises(KeyError):
+        s1["b"]
+
+    s2 = s1.set("a", 2)
+    assert len(s2) == 1
+    assert s2["a"] == 2
+    assert s1["a"] == 1
+
+    assert HAMTMap({"a": 1, "b": 2}) == {"a": 1, "b": 2}
+    assert HAMTMap(a=1) == HAMTMap({"a": 1})
+    assert repr(HAMTMap({"a": 1})) == "HAMTMap({'a': 1})"
+    assert s1.copy() is s1
+
+
+def test_HAMTMap_many():
+    d = {i: str(i) for i in range(2000)}
+    s = HAMTMap()
+    for k, v in d.items():
+        s = s.set(k, v)
+
+    assert len(s) == len(d)
+    assert dict(s) == d
+    assert set(s) == set(d)
+
+    for k in range(0, 2000, 2):
+        s = s.delete(k)
+
+    assert len(s) == 1000
+    assert dict(s) == {k: v for k, v in d.items() if k % 2}
+
+    with pytest.raises(KeyError):
+        s.delete(0)
+
+    for k in range(1, 2000, 2):
+        s = s.delete(k)
+
+    assert len(s) == 0
+    assert dict(s) == {}
+
+
+def test_HAMTMap_collisions():
+    a, b, c = Collider("a"), Collider("b"), Collider("c")
+    d = Collider("d", 1 << 31)
+
+    s = HAMTMap().set(a, 1).set(b, 2).set(d, 4)
+    assert len(s) == 3
+    assert s[a] == 1
+    assert s[b] == 2
+    assert s[d] == 4
+    assert c not in s
+
+    s = s.set(c, 3).set(b, 5)
+    assert dict(s) == {a: 1, b: 5, c: 3, d: 4}
+
+    s = s.delete(a).delete(d)
+    assert dict(s) == {b: 5, c: 3}
+
+    s = s.delete(c)
+    assert dict(s) == {b: 5}
+
+    # A collision node that was pulled up the trie must still split
+    # correctly when a key with a different hash is added.
+    s = HAMTMap().set(a, 1).set(b, 2).set(d, 4).delete(d).set(Collider("e", 32), 5)
+    assert dict(s) == {a: 1, b: 2, Collider("e", 32): 5}
+
+
+def test_HAMTMap_unify():
+    x, y, z = var(), var(), var()
+
+    s = HAMTMap()
+    assert assoc(s, x, 1) == {x: 1}
+    assert len(s) == 0
+
+    s = unify((x, y), (1, z), s)
+    assert isinstance(s, HAMTMap)
+    assert s == {x: 1, y: z}
+    assert unify((x, y), (2, z), s) is False
+    assert reify((x, y, z), s) == (1, z, z)
+    assert unground_lvars((x, y), s) == {z}
+    assert not isground((x, y), s)
+
+    s2 = unify(z, 3, s)
+    assert isinstance(s2, HAMTMap)
+    assert reify((x, y), s2) == (1, 3)
+    assert isground((x, y), s2)
+    assert s == {x: 1, y: z}
+
+
+def test_HAMTMap_compact():
+    x, y, z = var(), var(), var()
+
+    s = HAMTMap({x: y, y: (z, 1), z: 2})
+    cs = compact(s)
+    assert isinstance(cs, HAMTMap)
+    assert cs == {x: (2, 1), y: (2, 1), z: 2}
+
+    s = unify((x, y), (y, z), HAMTMap(), compact=True)
+    assert isinstance(s, HAMTMap)
+    assert s == {x: z, y: z}
@@ -0,0 +1,219 @@
+import pytest
+
+from unification import unifiable, unify, var
+from unification.index import DiscriminationTree, PatternIndex, TermStore
+
+
+def test_DiscriminationTree():
+    x, y = var(), var()
+
+    tree = DiscriminationTree()
+    assert len(tree) == 0
+    assert list(tree.candidates((1, 2))) == []
+
+    patterns = {
+        "a": (1, x),
+        "b": (2, x),
+        "c": x,
+        "d": (x, (1, 2)),
+        "e": [1, x],
+        "f": (1.0, (x, 2)),
+        "g": (1, {"a": x}),
+        "h": ((), "a", None),
+    }
+    for name, pattern in patterns.items():
+        tree.add(pattern, name)
+
+    assert len(tree) == len(patterns)
+
+    def candidates(term):
+        res = sorted(tree.candidates(term))
+        # The candidates must include every pattern that unifies
+        assert set(res) >= {
+            n for n, p in patterns.items() if unify(p, term, {}) is not False
+        }
+        return res
+
+    assert candidates((1, 3)) == ["a", "c", "g"]
+    assert candidates((1, (1, 2))) == ["a", "c", "d", "f", "g"]
+    assert candidates((True, (y, 2))) == ["a", "c", "d", "f", "g"]
+    assert candidates((y, 5)) == ["a", "b", "c", "g"]
+    assert candidates([1, 2]) == ["c", "e"]
+    assert candidates(((), "a", None)) == ["c", "h"]
+    assert candidates(((), "b", None)) == ["c"]
+    assert candidates(y) == sorted(patterns)
+    assert candidates((y, (y, y))) == ["a", "b", "c", "d", "f", "g"]
+    # Dicts aren't indexed, so they're treated like variables
+    assert candidates((1, {"b": 2})) == ["a", "c", "d", "f", "g"]
+
+    tree.add((1, x), "a2")
+    assert candidates((1, 3)) == ["a", "a2", "c", "g"]
+
+    tree.remove((1, x), "a")
+    assert sorted(tree.candidates((1, 3))) == ["a2", "c", "g"]
+    assert len(tree) == len(patterns)
+
+    with pytest.raises(KeyError):
+        tree.remove((1, x), "a")
+
+    with pytest.raises(KeyError):
+        tree.remove((1, 2, 3), "a")
+
+    # Nodes that no longer lead to any values are removed
+    tree.remove(((), "a", None), "h")
+    assert (tuple, 3) not in tree.root.children
+
+    tree.remove((x, (1, 2)), "d")
+    tree.remove((1.0, (x, 2)), "f")
+    assert sorted(tree.candidates((y, (1, 2)))) == ["a2", "b", "c", "g"]
+
+
+def test_DiscriminationTree_deep():
+    x = var()
+
+    term = pattern = 1
+    for i in range(5000):
+        term, pattern = (i, term), (i, pattern if i != 2500 else x)
+
+    tree = DiscriminationTree()
+    tree.add(pattern, "a")
+    tree.add(term, "b")
+
+    assert sorted(tree.candidates(term)) == ["a", "b"]
+    assert sorted(tree.candidates((1, term))) == []
+
+
+@unifiable
+class Event(object):
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+@unifiable
+class Other(object):
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+def test_DiscriminationTree_objects():
+    x = var()
+
+    tree = DiscriminationTree()
+    tree.add(Event("cpu", x), "a")
+    tree.add(Other("cpu", x), "b")
+    tree.add((Event(x, 1), 2), "c")
+    tree.add(x, "d")
+
+    assert sorted(tree.candidates(Event("disk", 2))) == ["a", "d"]
+    assert sorted(tree.candidates((Event("disk", 2), 2))) == ["c", "d"]
+    assert sorted(tree.candidates((Other("disk", 2), 2))) == ["d"]
+    assert sorted(tree.candidates(x)) == ["a", "b", "c", "d"]
+
+
+def test_PatternIndex():
+    x, y = var(), var()
+
+    index = PatternIndex()
+    assert len(index) == 0
+    assert list(index.matches(("cpu", 1))) == []
+
+    index.add(("cpu", x), "a")
+    index.add((y, 100), "b")
+    index.add(("disk", x), "c")
+    event_pattern = Event("cpu", x)
+    index.add(event_pattern, "d")
+    index.add(Event(y, {"level": x}), "e")
+    index.add(("cpu", x), "f")
+    assert len(index) == 6
+
+    assert list(index.matches(("cpu", 100))) == [
+        ("a", {x: 100}),
+        ("b", {y: "cpu"}),
+        ("f", {x: 100}),
+    ]
+    assert list(index.matches(("mem", 100))) == [("b", {y: "mem"})]
+    assert list(index.matches(Event("cpu", 5))) == [("d", {x: 5})]
+    assert list(index.matches(Event("mem", {"level": 3}))) == [("e", {y: "mem", x: 3})]
+    assert list(index.matches(Other("cpu", 5))) == []
+
+    # Only the candidates are unified with the term
+    assert len(list(index._tree.candidates(("disk", 1)))) == 1
+
+    index.remove(("cpu", x), "f")
+    assert [p for p, _ in index.matches(("cpu", 100))] == ["a", "b"]
+
+    # Patterns are compared with `==`, which is identity for `Event`s
+    with pytest.raises(KeyError):
+        index.remove(Event("cpu", x), "d")
+
+    index.remove(event_pattern, "d")
+    assert list(index.matches(Event("cpu", 5))) == []
+
+    with pytest.raises(KeyError):
+        index.remove(("cpu", x), "f")
+
+    with pytest.raises(KeyError):
+        index.remove(("cpu", 1, 2), "a")
+
+    assert len(index) == 4
+
+
+def test_TermStore():
+    x, y = var(), var()
+
+    store = TermStore()
+    assert len(store) == 0
+    assert list(store.find(x)) == []
+
+    facts = [
+        ("edge", 1, 2),
+        ("edge", 1, 3),
+        ("edge", 2, 3),
+        ("node", 1),
+        Event("cpu", 1),
+        Event("cpu", 2),
+        Other("cpu", 1),
+        ("edge", 1, Event("disk", 3)),
+    ]
+    store = TermStore(facts)
+    assert len(store) == len(facts)
+
+    def find(pattern, limit=None):
+        res = list(store.find(pattern, limit=limit))
+        expected = [unify(pattern, f, {}) for f in facts]
+        for s in res:
+            assert s in expected
+        return res
+
+    assert sorted(s[x] for s in find(("edge", 1, x)) if type(s[x]) is int) == [2, 3]
+    assert len(find(("edge", 1, x))) == 3
+    assert find(("edge", x, x)) == []
+    assert find(("node", x)) == [{x: 1}]
+    assert sorted(s[x] for s in find(Event("cpu", x))) == [1, 2]
+    assert find(("edge", y, Event(x, 3))) == [{y: 1, x: "disk"}]
+    assert find(("edge", 4, x)) == []
+    assert len(find(x)) == len(facts)
+
+    assert len(find(("edge", x, y), limit=2)) == 2
+    assert len(find(("edge", x, y), limit=10)) == 4
+    assert find(("edge", x, y), limit=0) == []
+
+    store.add(("node", 2))
+    facts.append(("node", 2))
+    assert len(store) == len(facts)
+    assert find(("node", 2)) == [{}]
+
+    store.add(("node", 1))
+    assert find(("node", 1)) == [{}, {}]
+
+    store.remove(("node", 1))
+    store.remove(("node", 1))
+    assert find(("node", 1)) == []
+
+    with pytest.raises(KeyError):
+        store.remove(("node", 1))
+
+    with pytest.raises(KeyError):
+        store.remove(Event("cpu", 1))
@@ -0,0 +1,112 @@
+import pytest
+
+from unification import unifiable, var
+from unification.lazy import LazyMapping, LazyObject, LazySequence, reify_lazy
+
+
+class CountingDict(dict):
+    """A substitution that records the variables that were looked up."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = []
+
+    def __getitem__(self, key):
+        self.lookups.append(key)
+        return super().__getitem__(key)
+
+
+@unifiable
+class Node(object):
+    def __init__(self, value, children):
+        self.value = value
+        self.children = children
+
+
+def test_reify_lazy_sequence():
+    x, y, z = var(), var(), var()
+    s = CountingDict({x: 1, y: (z, 2), z: 3})
+
+    t = reify_lazy([x, y, 4], s)
+    assert isinstance(t, LazySequence)
+    assert s.lookups == []
+    assert len(t) == 3
+
+    assert t[0] == 1
+    assert s.lookups == [x]
+
+    assert isinstance(t[1], LazySequence)
+    assert t[1] is t[1]
+    assert t[1][0] == 3
+    assert t[-1] == 4
+    assert t[1:] == [t[1], 4]
+    assert list(t) == [1, t[1], 4]
+
+    assert t.materialize() == [1, (3, 2), 4]
+    assert t.materialize() is t.materialize()
+    assert t == [1, (3, 2), 4]
+    assert t == reify_lazy([x, y, 4], s)
+    assert t != [1, (3, 2), 5]
+    assert repr(t) == f"LazySequence([{x!r}, {y!r}, 4])"
+
+    with pytest.raises(TypeError):
+        t[0] = 2
+
+    with pytest.raises(TypeError):
+        hash(t)
+
+
+def test_reify_lazy_mapping():
+    x, y = var(), var()
+    s = CountingDict({x: {"c": y}, y: [1]})
+
+    t = reify_lazy({"a": x, "b": 2}, s)
+    assert isinstance(t, LazyMapping)
+    assert set(t) == {"a", "b"}
+    assert len(t) == 2
+    assert t["b"] == 2
+    assert s.lookups == []
+
+    assert isinstance(t["a"], LazyMapping)
+    assert s.lookups == [x]
+    assert isinstance(t["a"]["c"], LazySequence)
+    assert t["a"]["c"][0] == 1
+    assert t == {"a": {"c": [1]}, "b": 2}
+
+    with pytest.raises(KeyError):
+        t["c"]
+
+
+def test_reify_lazy_object():
+    x, y = var(), var()
+    s = {x: 1, y: Node(x, [])}
+
+    t = reify_lazy(Node(x, [y]), s)
+    assert isinstance(t, LazyObject)
+    assert t.value == 1
+    assert isinstance(t.children[0], LazyObject)
+    assert t.children[0].value == 1
+    assert t.children[0].children == []
+
+    res = t.materialize()
+    assert isinstance(res, Node)
+    assert res.value == 1
+    assert res.children[0].value == 1
+
+    with pytest.raises(AttributeError):
+        t.value = 2
+
+    with pytest.raises(AttributeError):
+        del t.value
+
+    with pytest.raises(AttributeError):
+        t.missing
+
+
+def test_reify_lazy_other():
+    x = var()
+
+    assert reify_lazy(x, {x: 1}) == 1
+    assert reify_lazy(x, {}) is x
+    assert reify_lazy({x}, {x: 1}) == {1}
+    assert isinstance(reify_lazy(x, {x: (1,)}), LazySequence)
@@ -1,6 +1,15 @@
 from pytest import mark, raises
 
-from unification.match import Dispatcher, VarDispatcher, match, ordering, supercedes
+from unification.match import (
+    Dispatcher,
+    NoMatchError,
+    VarDispatcher,
+    match,
+    ordering,
+    supercedes,
+)
+from unification.more import unifiable
+from unification.utils import freeze
 from unification.variable import var
 
 
@@ -58,6 +67,105 @@ def test_complex():
         d(1, 2)
 
 
+def test_many_signatures():
+    d = Dispatcher("d")
+    x, y, z = var("x"), var("y"), var("z")
+
+    for i in range(200):
+        d.add(("event", i, x), lambda *args: args[1])
+
+    d.add(("event", y, z), lambda *args: "any")
+    d.add(("event", 100, 1), lambda *args: "specific")
+    d.add((y, (1, z)), lambda *args: "nested")
+
+    assert d("event", 5, "a") == 5
+    assert d("event", 100, 2) == 100
+    assert d("event", 100, 1) == "specific"
+    assert d("event", 1000, 1) == "any"
+    assert d("other", (1, 2)) == "nested"
+
+    with raises(NotImplementedError):
+        d("other", (2, 2))
+
+    # Only the signatures that can match are unified with the arguments
+    func, s = d.resolve(("event", 5, "a"))
+    assert s == {x: "a"}
+    assert set(d._index.candidates(freeze(("event", 5, "a")))) == {
+        ("event", 5, x),
+        ("event", y, z),
+    }
+
+
+def test_resolution_cache():
+    d = Dispatcher("d", cache_size=2)
+    x, y = var("x"), var("y")
+
+    d.add((0,), lambda n: 0)
+    d.add((1,), lambda n: 1)
+    d.add((x,), identity)
+    d.add(((y, 1),), foo)
+
+    # Ground signatures are looked up directly
+    assert d._ground == {(0,): d.funcs[(0,)], (1,): d.funcs[(1,)]}
+    assert d.resolve((1,)) == (d.funcs[(1,)], {})
+    assert d.resolve((True,)) == (d.funcs[(1,)], {})
+    assert len(d._cache) == 0
+
+    assert d.resolve((2,)) == (identity, {x: 2})
+    assert d.resolve(((2, 1),)) == (foo, {y: 2})
+    assert list(d._cache) == [(2,), ((2, 1),)]
+
+    # Cached signatures are still unified with the arguments
+    func, s = d.resolve((2.0,))
+    assert func is identity and type(s[x]) is float
+    assert list(d._cache) == [((2, 1),), (2,)]
+
+    # The least recently used arguments are evicted
+    assert d.resolve((3,)) == (identity, {x: 3})
+    assert list(d._cache) == [(2,), (3,)]
+
+    # Unhashable arguments aren't cached
+    b = bytearray(b"a")
+    assert d.resolve((b,)) == (identity, {x: b})
+    assert list(d._cache) == [(2,), (3,)]
+
+    # Adding signatures invalidates the cache
+    d.add((2,), dec)
+    assert len(d._cache) == 0
+    assert d(2) == 1
+
+    d.add((1,), inc)
+    assert d(1) == 2
+
+
+@unifiable
+class Box(object):
+    def __init__(self, a):
+        self.a = a
+
+
+def test_resolution_cache_mutation():
+    d = Dispatcher("d")
+    x = var("x")
+
+    d.add((Box(1),), inc)
+    d.add((x,), identity)
+
+    # Arguments that can be changed in-place aren't cached
+    b = Box(1)
+    assert d.resolve((b,)) == (inc, {})
+    assert len(d._cache) == 0
+
+    b.a = 2
+    assert d.resolve((b,)) == (identity, {x: b})
+    assert d(b) is b
+
+    # Even when they're changed to match a more specific signature
+    b.a = 1
+    assert d.resolve((b,)) == (inc, {})
+    assert d.resolve((Box(1),)) == (inc, {})
+
+
 def test_dict():
     d = Dispatcher("d")
     x = var("x")
@@ -83,6 +191,92 @@ def test_raises_error():
         d(1, 2, 3)
 
 
+class Label(str):
+    reprs = 0
+
+    def __repr__(self):
+        type(self).reprs += 1
+        return super().__repr__()
+
+
+def test_no_match():
+    d = Dispatcher("d")
+    d.add((Label("a"),), identity)
+
+    with raises(NoMatchError) as exc_info:
+        d("b")
+
+    # The message is only formatted on demand
+    assert Label.reprs == 0
+    assert (
+        str(exc_info.value)
+        == "No match found. \nKnown matches: [('a',)] \nInput: ('b',)"
+    )
+    assert Label.reprs == 1
+    assert isinstance(exc_info.value, NotImplementedError)
+
+    with raises(NoMatchError):
+        d.resolve(("b",))
+
+    # Misses are cached, too
+    assert d._cache[("b",)] is None
+
+    d.add(("b",), inc)
+    assert len(d._cache) == 0
+    assert d.resolve(("b",)) == (inc, {})
+
+
+def test_no_match_mutation():
+    d = Dispatcher("d")
+    d.add((Box(1),), inc)
+
+    # Arguments that can be changed in-place aren't cached as misses
+    b = Box(2)
+    with raises(NoMatchError):
+        d.resolve((b,))
+    assert len(d._cache) == 0
+
+    b.a = 1
+    assert d.resolve((b,)) == (inc, {})
+
+    # Misses of other arguments are, until a signature is added
+    with raises(NoMatchError):
+        d.resolve((2,))
+    assert d._cache[(2,)] is None
+
+    d.add((2,), dec)
+    assert d.resolve((2,)) == (dec, {})
+
+
+def test_default():
+    calls = []
+
+    def default(*args, **kwargs):
+        calls.append((args, kwargs))
+        return "default"
+
+    d = Dispatcher("d", default=default)
+    d.add((1,), inc)
+
+    assert d(1) == 2
+    assert d(2, key="value") == "default"
+    assert d(2) == "default"
+    assert calls == [((2,), {"key": "value"}), ((2,), {})]
+
+    # `resolve` still raises an error
+    with raises(NoMatchError):
+        d.resolve((2,))
+
+    d.default = None
+    with raises(NoMatchError):
+        d(2)
+
+    vd = VarDispatcher("vd", default=default)
+    vd.add(("inc", var("x")), inc)
+    assert vd("inc", 1) == 2
+    assert vd("dec", 1) == "default"
+
+
 def test_register():
     d = Dispatcher("d")
 
@@ -108,6 +108,26 @@ def test_unifiable_dict():
     assert reify(g, {x: 2}) == f
 
 
+def test_reify_object_copy_on_write():
+    x, y = var(), var()
+
+    f = A(1, A(x, (2, 3)))
+    assert reify(f, {y: 1}) is f
+    assert stream_eval(_reify_object(f, {y: 1})) is f
+
+    g = reify(f, {x: 2})
+    assert g == A(1, A(2, (2, 3)))
+    assert g is not f
+    assert g.b is not f.b
+    assert g.b.b is f.b.b
+
+    h = Aslot(A(x, 1), (2,))
+    h_r = reify(h, {x: 2})
+    assert h_r.a == A(2, 1)
+    assert h_r.b is h.b
+    assert reify(h, {y: 2}) is h
+
+
 @unifiable
 class Aslot(object):
     __slots__ = ("a", "b")
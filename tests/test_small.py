@@ -0,0 +1,70 @@
+import pytest
+
+from unification import var, variables
+from unification.core import assoc, isground, reify, unify, walk
+from unification.small import SmallMap, max_small_size
+
+
+def test_SmallMap_basic():
+    x, y = var(), var()
+
+    s = SmallMap()
+    assert len(s) == 0
+    assert s == {}
+    assert x not in s
+    assert [1] not in s
+
+    s1 = assoc(s, x, 1)
+    assert type(s1) is SmallMap
+    assert s1 == {x: 1}
+    assert s == {}
+    assert s1[x] == 1
+    assert s1.get(y) is None
+    assert list(s1) == [x]
+
+    with pytest.raises(KeyError):
+        s1[y]
+
+    s2 = assoc(s1, x, 2)
+    assert s2 == {x: 2}
+    assert s1 == {x: 1}
+
+    assert SmallMap({x: 1, y: 2}) == {x: 1, y: 2}
+    assert repr(SmallMap({x: 1})) == f"SmallMap({{{x!r}: 1}})"
+    assert s1.copy() is s1
+
+    with variables("a"):
+        s3 = assoc(SmallMap(), "a", 1)
+        assert s3["a"] == 1
+        assert walk("a", s3) == 1
+
+
+def test_SmallMap_promotion():
+    lvars = [var() for i in range(max_small_size + 1)]
+
+    s = SmallMap()
+    for i, lv in enumerate(lvars[:-1]):
+        s = assoc(s, lv, i)
+
+    assert type(s) is SmallMap
+    assert len(s) == max_small_size
+
+    s2 = assoc(s, lvars[0], -1)
+    assert type(s2) is SmallMap
+    assert s2[lvars[0]] == -1
+
+    s3 = assoc(s, lvars[-1], max_small_size)
+    assert type(s3) is dict
+    assert s3 == {lv: i for i, lv in enumerate(lvars)}
+
+
+def test_SmallMap_unify():
+    x, y, z = var(), var(), var()
+
+    s = unify((x, y), (y, [z]), SmallMap())
+    assert type(s) is SmallMap
+    assert s == {x: y, y: [z]}
+    assert reify(x, s) == [z]
+    assert not isground(x, s)
+    assert reify(x, unify(z, 1, s)) == [1]
+    assert unify((x, 1), (2, 3), s) is False
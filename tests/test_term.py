@@ -0,0 +1,91 @@
+import gc
+import pickle
+import weakref
+
+from unification import var
+from unification.core import isground, reify, unground_lvars, unify
+from unification.term import Term
+
+
+def test_Term_interning():
+    x = var()
+
+    t = Term("f", 1, Term("g", x))
+    assert t is Term("f", 1, Term("g", x))
+    assert t == Term("f", 1, Term("g", x))
+    assert hash(t) == hash(Term("f", 1, Term("g", x)))
+    assert t is not Term("f", 1, Term("g", var()))
+    assert Term("f", 1) is not Term("f", 1.0)
+    assert Term("f", 1) is not Term("f", True)
+    assert Term("f", (True,)) is not Term("f", (1,))
+    assert Term("f", (1.0,)) is not Term("f", (1,))
+    assert Term("f", ((1,), 2)) is not Term("f", ((True,), 2))
+    assert Term("f", frozenset([1])) is not Term("f", frozenset([1.0]))
+    assert type(Term("f", (1.0,)).args[0][0]) is float
+    assert pickle.loads(pickle.dumps(Term("f", 1, Term("g", 2)))) is Term(
+        "f", 1, Term("g", 2)
+    )
+
+    assert repr(t) == f"Term('f', 1, Term('g', {x!r}))"
+    assert t.op == "f"
+    assert t.args == (1, Term("g", x))
+
+    # Unused terms aren't kept alive by the intern table
+    t = Term("h", object())
+    t_ref = weakref.ref(t)
+    del t
+    gc.collect()
+    assert t_ref() is None
+
+
+def test_Term_attributes():
+    x, y = var(), var()
+
+    assert Term("f").size == 1
+    assert Term("f", x, Term("g", y, 1)).size == 5
+    assert Term(Term("h"), 1).size == 2
+
+    assert Term("f", 1).free_vars == frozenset()
+    assert Term("f", x, Term("g", y, x)).free_vars == {x, y}
+    assert Term(x, (y, 1)).free_vars == {x, y}
+
+
+def test_Term_unify_reify():
+    x, y = var(), var()
+
+    t = Term("f", x, Term("g", y, 1))
+    assert unify(t, Term("f", 1, Term("g", 2, 1)), {}) == {x: 1, y: 2}
+    assert unify(t, Term("f", 1, Term("g", 2, 2)), {}) is False
+    assert unify(t, Term("f", 1, Term("g", 2)), {}) is False
+    assert unify(t, Term("h", 1, Term("g", 2, 1)), {}) is False
+    assert unify(Term(x, 1), Term("f", 1), {}) == {x: "f"}
+    assert unify(t, ("f", 1, ("g", 2, 1)), {}) is False
+    assert unify([t, x], [Term("f", 1, y), 1], {}) == {x: 1, y: Term("g", y, 1)}
+
+    assert reify(t, {x: 1, y: 2}) is Term("f", 1, Term("g", 2, 1))
+    assert reify(t, {x: 1}) is Term("f", 1, Term("g", y, 1))
+    assert reify([t], {x: y, y: 2}) == [Term("f", 2, Term("g", 2, 1))]
+
+    res = reify(Term("f", (x,)), {x: True})
+    assert res.args == ((True,),)
+    assert type(res.args[0][0]) is bool
+    assert type(reify(Term("f", (x,)), {x: 1.0}).args[0][0]) is float
+
+
+def test_Term_isground():
+    x, y, z = var(), var(), var()
+
+    t = Term("f", x, Term("g", y, 1))
+    assert isground(Term("f", 1, Term("g", 2)), {})
+    assert not isground(t, {})
+    assert not isground(t, {x: 1})
+    assert not isground(t, {x: 1, y: (z,)})
+    assert isground(t, {x: 1, y: (2,)})
+    assert isground([t], {x: 1, y: (2,)})
+    assert not isground([t], {x: 1})
+
+    assert unground_lvars(Term("f", 1), {}) == set()
+    assert unground_lvars(t, {}) == {x, y}
+    assert unground_lvars(t, {x: 1, y: (z,)}) == {z}
+    assert unground_lvars(t, {x: 1, y: 2}) == set()
+    assert unground_lvars([t, z], {x: 1}) == {y, z}
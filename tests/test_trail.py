@@ -0,0 +1,96 @@
+from collections.abc import Mapping
+
+from tests.utils import isolate_dispatcher
+from unification import var
+from unification.core import _unify, assoc, reify, unify
+from unification.more import unifiable
+from unification.trail import TrailMap, unify_inplace
+
+
+def test_TrailMap_basic():
+    x, y = var(), var()
+
+    s = TrailMap({x: 1})
+    assert s == {x: 1}
+    assert repr(s) == f"TrailMap({{{x!r}: 1}})"
+
+    cp = s.checkpoint()
+    assert assoc(s, y, 2) is s
+    assert s == {x: 1, y: 2}
+
+    s[x] = 3
+    del s[y]
+    assert s == {x: 3}
+
+    s.rollback(cp)
+    assert s == {x: 1}
+
+    s[y] = 2
+    s.rollback()
+    assert s == {x: 1}
+
+    s2 = TrailMap({x: 1})
+    s3 = s2.copy()
+    s3[y] = 2
+    assert s2 == {x: 1}
+    assert s3.checkpoint() == 1
+
+
+def test_unify_inplace():
+    x, y, z = var(), var(), var()
+
+    s = TrailMap({x: 1})
+
+    res = unify_inplace((y, z), (2, 3), s)
+    assert res is s
+    assert s == {x: 1, y: 2, z: 3}
+
+    cp = s.checkpoint()
+    w = var()
+    assert unify_inplace((w, x), (4, 2), s) is False
+    assert s == {x: 1, y: 2, z: 3}
+    assert s.checkpoint() == cp
+
+    cp = s.checkpoint()
+    assert unify_inplace((w, [x, y]), (4, [1, 2]), s) is s
+    assert reify((w, x, y, z), s) == (4, 1, 2, 3)
+
+    s.rollback(cp)
+    assert s == {x: 1, y: 2, z: 3}
+
+
+@unifiable
+class Node(object):
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+
+def test_unify_inplace_custom(monkeypatch):
+    isolate_dispatcher(monkeypatch, _unify)
+
+    x, y = var(), var()
+
+    class Pair(object):
+        def __init__(self, a, b):
+            self.a = a
+            self.b = b
+
+    def _unify_Pair(u, v, s):
+        s = yield _unify(u.a, v.a, s)
+        if s is not False:
+            yield _unify(u.b, v.b, s)
+
+    _unify.add((Pair, Pair, Mapping), _unify_Pair)
+
+    s = TrailMap()
+    assert unify_inplace(Pair(x, Node(1, y)), Pair(1, Node(1, 2)), s) is s
+    assert s == {x: 1, y: 2}
+
+    s = TrailMap()
+    assert unify_inplace(Pair(x, Node(1, y)), Pair(1, Node(2, 2)), s) is False
+    assert s == {}
+
+    # Regular `unify` still works, but doesn't roll back.
+    assert unify(Pair(x, 2), Pair(1, 3), s) is False
+    assert s == {x: 1}
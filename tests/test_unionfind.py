@@ -0,0 +1,108 @@
+from unification import var
+from unification.core import assoc, isground, reify, unground_lvars, unify, walk
+from unification.unionfind import UnionFindMap
+
+
+def test_UnionFindMap_basic():
+    x, y, z = var(), var(), var()
+
+    s = UnionFindMap()
+    assert len(s) == 0
+    assert walk(x, s) is x
+    assert walk(1, s) == 1
+    assert walk([1], s) == [1]
+
+    s1 = assoc(s, x, y)
+    assert len(s) == 0
+    assert s1 == {x: y}
+    assert walk(x, s1) is y
+
+    s2 = assoc(s1, y, 1)
+    assert walk(x, s2) == 1
+    assert walk(y, s2) == 1
+    assert walk(x, s1) is y
+
+    s3 = assoc(s2, z, x)
+    assert walk(z, s3) == 1
+    assert len(s3) == 3
+
+    assert UnionFindMap({x: y, y: 1}) == {x: y, y: 1}
+    assert UnionFindMap({y: 1, x: y}) == {x: y, y: 1}
+    assert UnionFindMap({x: None}) == {x: None}
+    assert repr(UnionFindMap({x: 1})) == f"UnionFindMap({{{x!r}: 1}})"
+
+
+def test_UnionFindMap_path_compression():
+    lvars = [var() for i in range(100)]
+
+    s = UnionFindMap()
+    for a, b in zip(lvars, lvars[1:]):
+        s = unify(a, b, s)
+
+    s = unify(lvars[-1], "a", s)
+
+    assert all(walk(lv, s) == "a" for lv in lvars)
+
+    # Every variable now points (almost) directly at its class's root.
+    roots = {s.find(lv) for lv in lvars}
+    assert len(roots) == 1
+    root = roots.pop()
+    assert all(s[lv] is root for lv in lvars if lv is not root)
+
+    # The ranks keep the trees shallow even without walking.
+    s = UnionFindMap()
+    for a, b in zip(lvars, lvars[1:]):
+        s = assoc(s, a, b)
+
+    max_depth = 0
+    for lv in lvars:
+        depth = 0
+        while lv in s._parent:
+            lv = s._parent[lv]
+            depth += 1
+        max_depth = max(depth, max_depth)
+
+    assert max_depth <= 1
+
+
+def test_UnionFindMap_unify():
+    x, y, z = var(), var(), var()
+
+    s = unify((x, y), (y, z), UnionFindMap())
+    assert isinstance(s, UnionFindMap)
+    assert unground_lvars((x, y, z), s) == {s.find(x)}
+    assert not isground((x, y), s)
+
+    assert unify(x, 1, s) == unify(z, 1, s)
+
+    s2 = unify((x, 1), (2, z), s)
+    assert s2 is False
+
+    s2 = unify((x, [z]), (1, [1]), s)
+    assert reify((x, y, z), s2) == (1, 1, 1)
+    assert isground((x, y, z), s2)
+
+    s3 = unify(x, (1, y), UnionFindMap())
+    assert reify(x, unify(y, 2, s3)) == (1, 2)
+
+
+def test_UnionFindMap_sharing():
+    lvars = [var() for i in range(1000)]
+
+    s = UnionFindMap()
+    for a, b in zip(lvars[::2], lvars[1::2]):
+        s = assoc(s, a, b)
+
+    # Binding a value leaves the forest untouched, and neither version is
+    # copied wholesale.
+    s1 = assoc(s, lvars[-1], 1)
+    assert s1._parent is s._parent
+    assert s1._rank is s._rank
+    assert lvars[-1] not in s._values
+    assert walk(lvars[-2], s1) == 1
+    assert walk(lvars[-2], s) is lvars[-1]
+
+    s2 = assoc(s1, lvars[0], lvars[2])
+    assert len(s2) == len(s1) + 1
+    assert walk(lvars[0], s2) is s2.find(lvars[2])
+    assert walk(lvars[0], s1) is lvars[1]
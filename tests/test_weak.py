@@ -0,0 +1,61 @@
+import gc
+
+from unification import var, variables
+from unification.core import assoc, project, reify, unify, walk
+from unification.weak import WeakVarMap
+
+
+def bind_temporaries(lv, s):
+    tmp_1, tmp_2 = var(), var()
+    return unify((lv, tmp_1, tmp_2), ((tmp_1,), 2, 3), s)
+
+
+def test_WeakVarMap_basic():
+    x, y = var(), var()
+
+    s = WeakVarMap({x: 1})
+    s2 = assoc(s, y, 2)
+    assert s == {x: 1}
+    assert s2 == {x: 1, y: 2}
+    assert len(s2) == 2
+    assert repr(s) == f"WeakVarMap({{{x!r}: 1}})"
+
+    del s2[y]
+    assert s2 == {x: 1}
+
+    with variables(1):
+        s3 = assoc(WeakVarMap(), 1, 2)
+        assert s3 == {1: 2}
+        assert 1 in s3
+        assert s3[1] == 2
+        assert walk(1, s3) == 2
+        del s3[1]
+        assert s3 == {}
+
+
+def test_WeakVarMap_gc():
+    x = var()
+
+    s = bind_temporaries(x, WeakVarMap())
+    gc.collect()
+
+    # `tmp_2` is unreachable, but `tmp_1` is still referenced by the value of
+    # `x`.
+    assert len(s) == 2
+    assert reify(x, s) == (2,)
+
+    s = bind_temporaries(x, {})
+    assert len(s) == 3
+
+
+def test_project():
+    x, y, z, w = var(), var(), var(), var()
+
+    s = {x: (1, y), y: z, z: 2, w: 3}
+    assert project(s, [x]) == {x: (1, 2)}
+    assert project(s, [x, y, w]) == {x: (1, 2), y: 2, w: 3}
+    assert project(s, [var()]) == {}
+    assert project({x: y}, [x, y]) == {x: y}
+
+    s = bind_temporaries(x, {})
+    assert project(s, [x]) == {x: (2,)}
@@ -8,3 +8,10 @@ def gen_long_chain(last_elem=None, N=None):
     for i in range(N - 1, 0, -1):
         b_struct = [i, last_elem if i == N - 1 else b_struct]
     return b_struct
+
+
+def isolate_dispatcher(monkeypatch, dispatcher):
+    """Undo the implementations added to `dispatcher` when the test finishes."""
+    monkeypatch.setattr(dispatcher, "funcs", dict(dispatcher.funcs))
+    monkeypatch.setattr(dispatcher, "_cache", {})
+    monkeypatch.setattr(dispatcher, "_dispatcher", None)
@@ -1,7 +1,24 @@
-from ._version import get_versions
+import sys
+
 from .core import assoc, reify, unify
 from .more import unifiable
 from .variable import Var, isvar, var, variables, vars
 
-__version__ = get_versions()["version"]
-del get_versions
+if sys.version_info < (3, 7):  # pragma: no cover
+    from ._version import get_versions
+
+    __version__ = get_versions()["version"]
+    del get_versions
+else:
+
+    def __getattr__(name):
+        # The version is only resolved when it's needed, since that can
+        # involve running `git` in a source checkout.
+        if name == "__version__":
+            from ._version import get_versions
+
+            global __version__
+            __version__ = get_versions()["version"]
+            return __version__
+
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+from .core import reify, unground_lvars, walk
+
+
+def _walked_bindings(lvars, s):
+    """Pair every logic variable reached from `lvars` in `s` with what it walks to.
+
+    These are all the variables that `reify` looks up, so a term that
+    contains `lvars` reifies to the same result under any substitution in
+    which they walk to the same objects.
+    """
+    res = {}
+    pending = list(lvars)
+
+    while pending:
+        lv = pending.pop()
+
+        if lv in res:
+            continue
+
+        value = res[lv] = walk(lv, s)
+
+        if value is not lv:
+            pending.extend(unground_lvars(value, {}))
+
+    return tuple(res.items())
+
+
+class ReifyCache(object):
+    """A bounded cache of reified terms.
+
+    `ReifyCache.reify` is `reify` for terms that are reified over and over
+    again (e.g. templates) against substitutions that change slowly.  The
+    cache is keyed by the identity of the terms, and each entry records what
+    the logic variables reached while reifying the term walked to.  An entry
+    is reused as long as each of those variables still walks to the identical
+    object, which only takes a walk per variable, so only the terms whose
+    variables changed are reified again.  (Rebinding a variable to an equal,
+    but different, object counts as a change.)  The least recently used
+    entries are evicted once there are more than `maxsize` of them.
+
+    The cache holds on to the terms and their reified values, and returns the
+    same reified objects for as long as they're valid, so neither should be
+    changed in-place.
+
+    >>> x, y = var('x'), var('y')
+    >>> cache = ReifyCache()
+    >>> template = {'a': x, 'b': [1, 2, 3]}
+    >>> cache.reify(template, {x: 1})
+    {'a': 1, 'b': [1, 2, 3]}
+    >>> cache.reify(template, {x: 1, y: 2}) is cache.reify(template, {x: 1})
+    True
+    >>> cache.reify(template, {x: 2})
+    {'a': 2, 'b': [1, 2, 3]}
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def reify(self, e, s):
+        """Reify `e` with `s`, reusing the cached result when it's still valid."""
+        key = id(e)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            _, lvars, bindings, res = entry
+
+            if all(walk(lv, s) is value for lv, value in bindings):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return res
+        else:
+            lvars = tuple(unground_lvars(e, {}))
+
+        self.misses += 1
+
+        res = reify(e, s)
+        # Keeping `e` (and the walked values) alive guarantees that their
+        # `id`s aren't reused.
+        self._entries[key] = (e, lvars, _walked_bindings(lvars, s), res)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return res
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(maxsize={self.maxsize}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
@@ -1,17 +1,26 @@
 from collections import OrderedDict, deque
 from collections.abc import Generator, Iterator, Mapping, Set
 from copy import copy
-from functools import partial
+from functools import partial, update_wrapper
+from itertools import tee
 from operator import length_hint
 
 from .dispatch import dispatch
-from .utils import transitive_get as walk
 from .variable import Var, isvar
 
 # An object used to tell the reifier that the next yield constructs the reified
 # object from its constituent refications (if any).
 construction_sentinel = object()
 
+# The nesting depth up to which `unify` and `reify` process terms with plain
+# recursion.  Deeper subterms are processed with an explicit stack, which is
+# slower, but isn't bounded by the Python recursion limit.
+max_recursive_depth = 50
+
+# The number of ground tuples whose structural fingerprints `unify` caches (see
+# `fingerprint`).  Fingerprints aren't used when this is zero.
+max_fingerprints = 0
+
 
 @dispatch(Mapping, object, object)
 def assoc(s, u, v):
@@ -24,6 +33,92 @@ def assoc(s, u, v):
     return s
 
 
+class LayeredMap(Mapping):
+    """A substitution that layers new bindings on top of a read-only base.
+
+    `assoc` only copies the top layer of a `LayeredMap`, so many
+    substitutions can extend one large base substitution without duplicating
+    it.  Layers can be stacked by using a `LayeredMap` as a base.
+
+    Like a `dict`, a `LayeredMap` can be copied and extended in-place, which
+    only copies and changes its top layer.
+
+    >>> x, y = var('x'), var('y')
+    >>> base = {x: 1}
+    >>> s = unify(y, 2, LayeredMap(base))
+    >>> s.bindings
+    {~y: 2}
+    >>> s[x], s[y]
+    (1, 2)
+    """
+
+    __slots__ = ("base", "bindings")
+
+    def __init__(self, base, bindings=None):
+        self.base = base
+        self.bindings = {} if bindings is None else bindings
+
+    def copy(self):
+        return type(self)(self.base, self.bindings.copy())
+
+    def __getitem__(self, key):
+        try:
+            return self.bindings[key]
+        except KeyError:
+            return self.base[key]
+
+    def __setitem__(self, key, value):
+        self.bindings[key] = value
+
+    def __contains__(self, key):
+        return key in self.bindings or key in self.base
+
+    def __iter__(self):
+        yield from self.bindings
+        for key in self.base:
+            if key not in self.bindings:
+                yield key
+
+    def __len__(self):
+        return len(self.base) + sum(1 for k in self.bindings if k not in self.base)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.base!r}, {self.bindings!r})"
+
+    def materialize(self):
+        """Merge the top layer into a copy of the base substitution."""
+        if not self.bindings:
+            return self.base
+
+        s = self.base.copy()
+        s.update(self.bindings)
+        return s
+
+
+@assoc.register(LayeredMap, object, object)
+def assoc_LayeredMap(s, u, v):
+    s = s.copy()
+    s[u] = v
+    return s
+
+
+@dispatch(object, Mapping)
+def walk(u, s):
+    """Follow the bindings of `u` in `s` until an unbound term is reached.
+
+    >>> x, y = var(), var()
+    >>> walk(x, {x: y, y: 1})
+    1
+    """
+    # Only logic variables are looked up, so that large terms aren't hashed.
+    while isvar(u):
+        try:
+            u = s[u]
+        except KeyError:
+            break
+    return u
+
+
 def stream_eval(z, res_filter=None):
     """Evaluate a stream of `_reify`/`_unify` results.
 
@@ -63,6 +158,91 @@ class UngroundLVarException(Exception):
     """An exception signaling that an unground variable was found."""
 
 
+class UnifyPairs(object):
+    """Wrap a `_unify` implementation that returns the subterms to unify.
+
+    The wrapped function takes the same arguments as any `_unify`
+    implementation and returns either `False`, when the terms can't be
+    unified, or an iterable of ``(sub_u, sub_v)`` pairs that must all be
+    unified (in order) for the terms to unify.  `unify` schedules those pairs
+    itself, which is cheaper than evaluating a generator per term.
+
+    >>> class Pair(object):
+    ...     def __init__(self, a, b):
+    ...         self.a, self.b = a, b
+    >>> @_unify.register(Pair, Pair, Mapping)
+    ... @UnifyPairs
+    ... def _unify_Pair(u, v, s):
+    ...     return [(u.a, v.a), (u.b, v.b)]
+    >>> x = var('x')
+    >>> unify(Pair(1, x), Pair(1, 2), {})
+    {~x: 2}
+    """
+
+    def __init__(self, func):
+        self.func = func
+        update_wrapper(self, func)
+
+    def __call__(self, u, v, s):
+        # Follow the generator-based protocol, so that these implementations
+        # can also be evaluated by `stream_eval`.
+        pairs = self.func(u, v, s)
+
+        if pairs is False:
+            yield False
+            return
+
+        for uu, vv in pairs:
+            s = yield _unify(uu, vv, s)
+            if s is False:
+                return
+
+        yield s
+
+
+class ReifyChildren(object):
+    """Wrap a `_reify` implementation that returns the subterms to reify.
+
+    The wrapped function takes the same arguments as any `_reify`
+    implementation and returns a pair consisting of an iterable of subterms
+    and a constructor.  `reify` reifies the subterms itself and then calls
+    the constructor with a list of their reified values, which is cheaper
+    than evaluating a generator per term.  When none of the subterms change,
+    the constructor isn't called and the original term is used.
+
+    >>> class Pair(object):
+    ...     def __init__(self, a, b):
+    ...         self.a, self.b = a, b
+    >>> @_reify.register(Pair, Mapping)
+    ... @ReifyChildren
+    ... def _reify_Pair(o, s):
+    ...     return (o.a, o.b), lambda args: Pair(*args)
+    >>> x = var('x')
+    >>> reify(Pair(1, x), {x: 2}).b
+    2
+    """
+
+    def __init__(self, func):
+        self.func = func
+        update_wrapper(self, func)
+
+    def __call__(self, o, s):
+        children, ctor = self.func(o, s)
+
+        res = []
+        changed = False
+        for y in children:
+            r = _reify(y, s)
+            if isinstance(r, Generator):
+                r = yield r
+            changed = changed or r is not y
+            res.append(r)
+
+        yield construction_sentinel
+
+        yield ctor(res) if changed else o
+
+
 @dispatch(object, Mapping)
 def _reify(o, s):
     return o
@@ -87,21 +267,23 @@ def _reify_Iterable_ctor(ctor, t, s):
 
     This approach allows us "collapse" nested `_reify` calls by pushing nested
     calls up the stack.
+
+    When none of the elements change, `t` itself is the result (unless it's
+    an iterator, which is consumed in the process).
     """
     res = []
+    changed = ctor is iter
 
-    if isinstance(t, Mapping):
-        t = t.items()
-
-    for y in t:
+    for y in t.items() if isinstance(t, Mapping) else t:
         r = _reify(y, s)
         if isinstance(r, Generator):
             r = yield r
+        changed = changed or r is not y
         res.append(r)
 
     yield construction_sentinel
 
-    yield ctor(res)
+    yield ctor(res) if changed else t
 
 
 for seq, ctor in (
@@ -126,7 +308,162 @@ def _reify_slice(o, s):
 
     yield construction_sentinel
 
-    yield slice(start, stop, step)
+    if start is o.start and stop is o.stop and step is o.step:
+        yield o
+    else:
+        yield slice(start, stop, step)
+
+
+_reify_default = _reify.dispatch(object, Mapping)
+
+_missing = object()
+
+
+def _replayable(it, iters):
+    """Return a copy of the iterator `it` that can be read again after a restart.
+
+    When `unify` and `reify` run out of stack, they start over with an
+    explicit stack, but by then the first attempt may have consumed some of
+    the iterators in the terms.  The first time `it` is seen, it's split with
+    `tee` and the second copy is stored in `iters`; the second time, that
+    copy is returned, so that the restart reads the same elements.
+
+    The length hint of `it` is also returned, since the copies don't have one.
+    """
+    try:
+        _, res, hint = iters.pop(id(it))
+    except KeyError:
+        hint = length_hint(it, -1)
+        res, replay = tee(it)
+        # Keeping `it` alive guarantees that its `id` isn't reused.
+        iters[id(it)] = (it, replay, hint)
+
+    return res, hint
+
+
+def _slice_ctor(args):
+    return slice(*args)
+
+
+def _reify_eval(e, s, iters, cache=None):
+    """Reify a term using an explicit stack instead of generators.
+
+    Built-in terms (i.e. logic variables and the types registered in this
+    module) are reified directly.  Terms with other `_reify` implementations
+    are reified by calling them and evaluating their results with
+    `stream_eval`.
+
+    Iterators are read through `_replayable` with `iters`.  When `cache` is
+    a `dict`, the reified values of the logic variables are looked up in, and
+    added to, it.
+    """
+    # Each frame holds the child of the parent term that's being reified, the
+    # term it walked to, a constructor, an iterator over the term's unreified
+    # children, the list of its children's reified values, and whether or not
+    # any of them changed (i.e. whether the term needs to be reconstructed).
+    stack = []
+    o = child = e
+
+    while True:
+        impl = _reify.resolve((type(o), type(s)))
+
+        if impl is _reify_Var:
+            if cache is not None and o in cache:
+                r = cache[o]
+            else:
+                o_w = walk(o, s)
+                if o_w is not o:
+                    o = o_w
+                    continue
+                r = o
+        elif impl is _reify_default:
+            r = o
+        elif type(impl) is partial and impl.func is _reify_Iterable_ctor:
+            ctor = impl.args[0]
+            if ctor is iter:
+                items, _ = _replayable(o, iters)
+            else:
+                items = o.items() if isinstance(o, Mapping) else o
+            stack.append([child, o, ctor, iter(items), [], ctor is iter])
+            r = _missing
+        elif impl is _reify_slice:
+            items = iter((o.start, o.stop, o.step))
+            stack.append([child, o, _slice_ctor, items, [], False])
+            r = _missing
+        elif type(impl) is ReifyChildren:
+            children, ctor = impl.func(o, s)
+            stack.append([child, o, ctor, iter(children), [], False])
+            r = _missing
+        else:
+            r = stream_eval(impl(o, s))
+
+        while stack:
+            frame = stack[-1]
+
+            if r is not _missing:
+                frame[4].append(r)
+                if r is not child:
+                    frame[5] = True
+                    if cache is not None and isvar(child):
+                        cache[child] = r
+
+            o = child = next(frame[3], _missing)
+
+            if o is not _missing:
+                break
+
+            stack.pop()
+            child, o, ctor, _, res, changed = frame
+            r = ctor(res) if changed else o
+        else:
+            return r
+
+
+def _reify_recursive(o, s, depth, iters, cache=None):
+    """Reify a term recursively, switching to `_reify_eval` below `depth` levels."""
+    impl = _reify.resolve((type(o), type(s)))
+
+    if impl is _reify_Var:
+        if cache is None:
+            o_w = walk(o, s)
+            if o_w is o:
+                return o
+            return _reify_recursive(o_w, s, depth, iters)
+
+        try:
+            return cache[o]
+        except KeyError:
+            o_w = walk(o, s)
+            if o_w is o:
+                return o
+            r = cache[o] = _reify_recursive(o_w, s, depth, iters, cache)
+            return r
+
+    if impl is _reify_default:
+        return o
+
+    if depth > 0:
+        if type(impl) is partial and impl.func is _reify_Iterable_ctor:
+            ctor = impl.args[0]
+            if ctor is iter:
+                children, _ = _replayable(o, iters)
+            else:
+                children = o.items() if isinstance(o, Mapping) else o
+        elif type(impl) is ReifyChildren:
+            children, ctor = impl.func(o, s)
+        else:
+            return _reify_eval(o, s, iters, cache)
+
+        res = []
+        changed = ctor is iter
+        for y in children:
+            r = _reify_recursive(y, s, depth - 1, iters, cache)
+            changed = changed or r is not y
+            res.append(r)
+
+        return ctor(res) if changed else o
+
+    return _reify_eval(o, s, iters, cache)
 
 
 @dispatch(object, Mapping)
@@ -147,7 +484,82 @@ def reify(e, s):
     if len(s) == 0:
         return e
 
-    return stream_eval(_reify(e, s))
+    iters = {}
+    try:
+        return _reify_recursive(e, s, max_recursive_depth, iters)
+    except RecursionError:
+        # The stack was already too deep for the recursive approach.
+        return _reify_eval(e, s, iters)
+
+
+def reify_many(terms, s):
+    """Reify each of the `terms` with `s` and return the results in a list.
+
+    This is cheaper than calling `reify` for each term, because every logic
+    variable is resolved at most once for the whole batch.  As a result, the
+    reified values of variables that occur in several terms are shared between
+    the results.
+
+    >>> x, y = var('x'), var('y')
+    >>> reify_many([(x, 1), [y, x]], {x: (y, 2), y: 3})
+    [((3, 2), 1), [3, (3, 2)]]
+    """
+    if len(s) == 0:
+        return list(terms)
+
+    cache = {}
+    res = []
+    for e in terms:
+        iters = {}
+        try:
+            r = _reify_recursive(e, s, max_recursive_depth, iters, cache)
+        except RecursionError:
+            r = _reify_eval(e, s, iters, cache)
+        res.append(r)
+
+    return res
+
+
+@dispatch(Mapping)
+def compact(s):
+    """Rewrite a substitution into idempotent solved form.
+
+    Every variable in the resulting substitution is mapped directly to its
+    fully reified value, so no bound variable appears in any value and
+    walking a variable takes a single lookup.
+
+    The result has the same type as `s`, which is constructed from a `dict`
+    of the compacted bindings.  Substitution types that can't be constructed
+    that way need their own `compact` implementation.
+
+    >>> x, y, z = var('x'), var('y'), var('z')
+    >>> compact({x: y, y: (1, z), z: 2})
+    {~x: (1, 2), ~y: (1, 2), ~z: 2}
+    """
+    res = {k: reify(v, s) for k, v in s.items()}
+
+    if type(s) is dict:
+        return res
+
+    return type(s)(res)
+
+
+# `unify`'s `compact` argument shadows this function.
+_compact = compact
+
+
+@dispatch(Mapping, object)
+def project(s, lvars):
+    """Restrict a substitution to the bindings of the logic variables `lvars`.
+
+    The bindings of any intermediate variables are resolved, so the result
+    only maps the bound variables in `lvars` to their fully reified values.
+
+    >>> x, y, z = var('x'), var('y'), var('z')
+    >>> project({x: (1, y), y: z, z: 2}, [x])
+    {~x: (1, 2)}
+    """
+    return {lv: reify(lv, s) for lv in lvars if lv in s}
 
 
 @dispatch(object, object, Mapping)
@@ -235,25 +647,354 @@ def _unify_slice(u, v, s):
     s = yield _unify(u.step, v.step, s)
 
 
+_unify_default = _unify.dispatch(object, object, Mapping)
+
+# The immutable atoms that can appear in fingerprinted tuples.  `_unify`
+# compares them with `==`, and equal atoms have equal hashes.
+_atom_types = {int, float, complex, bool, str, bytes, type(None)}
+
+# Maps the `id`s of fingerprinted tuples to the tuples and their fingerprints.
+# Keeping the tuples alive guarantees that the `id`s aren't reused.
+_fingerprints = {}
+
+
+def fingerprint(t):
+    """Return a structural fingerprint of the tuple `t`.
+
+    The fingerprint of a tuple that only contains atoms (e.g. numbers and
+    strings) and other such tuples is a hash of the fingerprints of its
+    elements.  Equal tuples have equal fingerprints, so tuples with different
+    fingerprints can't unify.  The fingerprint of any other tuple (e.g. one
+    that contains a logic variable) is `None`.
+
+    Fingerprints are cached by identity for up to `max_fingerprints` tuples.
+    """
+    try:
+        return _fingerprints[id(t)][1]
+    except KeyError:
+        pass
+
+    # Compute the fingerprints of all the nested tuples in post-order.
+    fps = {}
+    stack = [t]
+    while stack:
+        o = stack[-1]
+
+        if id(o) in fps:
+            stack.pop()
+            continue
+
+        children = [
+            c
+            for c in o
+            if type(c) is tuple and id(c) not in fps and id(c) not in _fingerprints
+        ]
+        if children:
+            stack.extend(children)
+            continue
+
+        stack.pop()
+
+        child_fps = []
+        for c in o:
+            if type(c) is tuple:
+                fp = fps[id(c)] if id(c) in fps else _fingerprints[id(c)][1]
+            elif type(c) in _atom_types:
+                fp = hash(c)
+            else:
+                fp = None
+
+            if fp is None:
+                break
+
+            child_fps.append(fp)
+        else:
+            fp = hash(tuple(child_fps))
+
+        fps[id(o)] = fp
+
+        _fingerprints[id(o)] = (o, fp)
+
+    while len(_fingerprints) > max_fingerprints:
+        del _fingerprints[next(iter(_fingerprints))]
+
+    return fps[id(t)]
+
+
+def _unify_fingerprinted(u, v):
+    """Unify two tuples using their fingerprints.
+
+    Returns `None` when the fingerprints can't decide the result, otherwise
+    whether or not `u` and `v` unify.
+    """
+    fp_u = fingerprint(u)
+    if fp_u is None:
+        return None
+
+    fp_v = fingerprint(v)
+    if fp_v is None:
+        return None
+
+    if fp_u != fp_v:
+        return False
+
+    # Fingerprints can collide, but `==` only needs to do the work of a
+    # successful unification.
+    try:
+        return u == v
+    except RecursionError:
+        return None
+
+
+def _unify_eval(u, v, s, iters):
+    """Unify two terms using an explicit stack instead of generators.
+
+    Built-in terms (i.e. logic variables and the types registered in this
+    module) are unified directly.  Terms with other `_unify` implementations
+    are unified by calling them and evaluating their results with
+    `stream_eval`.  Iterators are read through `_replayable` with `iters`.
+    """
+    # The pairs of terms that remain to be unified, in reverse order.
+    pending = [(u, v)]
+
+    while pending:
+        u, v = pending.pop()
+
+        if u is v:
+            continue
+
+        impl = _unify.resolve((type(u), type(v), type(s)))
+
+        if impl is _unify_Var_object:
+            u = walk(u, s)
+            v = walk(v, s)
+
+            if u == v:
+                continue
+            elif isvar(u):
+                s = assoc(s, u, v)
+            elif isvar(v):
+                s = assoc(s, v, u)
+            else:
+                pending.append((u, v))
+
+        elif impl is _unify_default:
+            if u != v:
+                return False
+
+        elif impl is _unify_Iterable:
+            if type(u) is tuple or type(u) is list or not isinstance(u, Iterator):
+                len_u, len_v = length_hint(u, -1), length_hint(v, -1)
+            else:
+                u, len_u = _replayable(u, iters)
+                v, len_v = _replayable(v, iters)
+
+            if len_u != len_v:
+                return False
+
+            if max_fingerprints and type(u) is tuple and type(v) is tuple:
+                res = _unify_fingerprinted(u, v)
+                if res is False:
+                    return False
+                elif res:
+                    continue
+
+            pending.extend(reversed(list(zip(u, v))))
+
+        elif impl is _unify_Mapping:
+            if len(u) != len(v):
+                return False
+
+            pairs = []
+            for key, uval in u.items():
+                if key not in v:
+                    return False
+                pairs.append((uval, v[key]))
+
+            pending.extend(reversed(pairs))
+
+        elif impl is _unify_Set:
+            i = u & v
+            pending.append((iter(u - i), iter(v - i)))
+
+        elif impl is _unify_slice:
+            pending.append((u.step, v.step))
+            pending.append((u.stop, v.stop))
+            pending.append((u.start, v.start))
+
+        elif type(impl) is UnifyPairs:
+            pairs = impl.func(u, v, s)
+
+            if pairs is False:
+                return False
+
+            pending.extend(reversed(list(pairs)))
+
+        else:
+            s = stream_eval(impl(u, v, s))
+
+            if s is False:
+                return False
+
+    return s
+
+
+def _unify_recursive(u, v, s, depth, iters):
+    """Unify two terms recursively, switching to `_unify_eval` below `depth` levels."""
+    if u is v:
+        return s
+
+    impl = _unify.resolve((type(u), type(v), type(s)))
+
+    if impl is _unify_Var_object:
+        u = walk(u, s)
+        v = walk(v, s)
+
+        if u == v:
+            return s
+        elif isvar(u):
+            return assoc(s, u, v)
+        elif isvar(v):
+            return assoc(s, v, u)
+
+        return _unify_recursive(u, v, s, depth, iters)
+
+    if impl is _unify_default:
+        return s if u == v else False
+
+    if depth > 0:
+        if impl is _unify_Iterable:
+            if type(u) is tuple or type(u) is list or not isinstance(u, Iterator):
+                len_u, len_v = length_hint(u, -1), length_hint(v, -1)
+            else:
+                u, len_u = _replayable(u, iters)
+                v, len_v = _replayable(v, iters)
+
+            if len_u != len_v:
+                return False
+
+            if max_fingerprints and type(u) is tuple and type(v) is tuple:
+                res = _unify_fingerprinted(u, v)
+                if res is not None:
+                    return s if res else False
+
+            pairs = zip(u, v)
+        elif type(impl) is UnifyPairs:
+            pairs = impl.func(u, v, s)
+            if pairs is False:
+                return False
+        else:
+            return _unify_eval(u, v, s, iters)
+
+        for uu, vv in pairs:
+            s = _unify_recursive(uu, vv, s, depth - 1, iters)
+            if s is False:
+                return False
+
+        return s
+
+    return _unify_eval(u, v, s, iters)
+
+
+def _unify_hybrid(u, v, s):
+    iters = {}
+    try:
+        return _unify_recursive(u, v, s, max_recursive_depth, iters)
+    except RecursionError:
+        # The stack was already too deep for the recursive approach.  Since
+        # any bindings that were made in-place (e.g. in a `TrailMap`) are
+        # consistent with `u` and `v`, and the iterators that were read can be
+        # replayed, we can simply start over.
+        return _unify_eval(u, v, s, iters)
+
+
+# The numbers of implementations `_dict_overridden` last checked, and its result.
+_dict_overrides = (None, False)
+
+
+def _dict_overridden():
+    """Determine whether any implementation is registered specifically for `dict`.
+
+    `unify` layers the bindings it adds to a `dict` substitution in a
+    `LayeredMap`, which would bypass `_unify`, `_reify`, `assoc` and `walk`
+    implementations that a `LayeredMap` doesn't dispatch to.
+    """
+    global _dict_overrides
+
+    dispatchers = ((_unify, -1), (_reify, -1), (assoc, 0), (walk, -1))
+    key = tuple(len(d.funcs) for d, _ in dispatchers)
+
+    if _dict_overrides[0] != key:
+        res = any(
+            issubclass(dict, sig[i]) and not issubclass(LayeredMap, sig[i])
+            for d, i in dispatchers
+            for sig in d.funcs
+        )
+        _dict_overrides = (key, res)
+
+    return _dict_overrides[1]
+
+
 @dispatch(object, object, Mapping)
-def unify(u, v, s):
+def unify(u, v, s, delta=False, compact=False):
     """Find substitution so that u == v while satisfying s.
 
     >>> x = var('x')
     >>> unify((1, x), (1, 2), {})
     {~x: 2}
+
+    When `delta` is true, only the bindings that were added to `s` are
+    returned.
+
+    >>> y = var('y')
+    >>> unify((1, x), (y, 2), {y: 1}, delta=True)
+    {~x: 2}
+
+    When `compact` is true, the result is put into idempotent solved form
+    (see `compact`).
+
+    >>> unify((x, y), (y, 2), {}, compact=True)
+    {~x: 2, ~y: 2}
     """
     if u is v:
-        return s
+        res = {} if delta else s
+    elif type(s) is dict and _dict_overridden():
+        res = _unify_hybrid(u, v, s)
+
+        if delta and res is not False:
+            new = {k: w for k, w in res.items() if k not in s or s[k] is not w}
+            if compact:
+                return {k: reify(w, res) for k, w in new.items()}
+            return new
+    elif delta or type(s) is dict:
+        # Accumulate the new bindings in their own layer, so that `s` is
+        # copied at most once, instead of once per binding.  (`dict`
+        # subclasses may have their own `assoc` semantics, so they're left
+        # alone.)
+        res = _unify_hybrid(u, v, LayeredMap(s))
+
+        if isinstance(res, LayeredMap) and res.base is s:
+            if delta:
+                if compact:
+                    return {k: reify(v, res) for k, v in res.bindings.items()}
+                return res.bindings
+
+            res = res.materialize()
+    else:
+        res = _unify_hybrid(u, v, s)
 
-    return stream_eval(_unify(u, v, s))
+    if compact and res is not False:
+        return _compact(res)
+
+    return res
 
 
 @unify.register(object, object)
-def unify_NoMap(u, v):
-    return unify(u, v, {})
+def unify_NoMap(u, v, delta=False, compact=False):
+    return unify(u, v, {}, delta=delta, compact=compact)
 
 
+@dispatch(object, Mapping)
 def unground_lvars(u, s):
     """Return the unground logic variables from a term and state."""
 
@@ -277,6 +1018,7 @@ def unground_lvars(u, s):
     return lvars
 
 
+@dispatch(object, Mapping)
 def isground(u, s):
     """Determine whether or not `u` contains an unground logic variable under mappings `s`."""  # noqa: E501
 
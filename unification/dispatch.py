@@ -1,7 +1,173 @@
-from functools import partial
-
-from multipledispatch import dispatch
+from itertools import islice, product
 
 namespace = dict()
 
-dispatch = partial(dispatch, namespace=namespace)
+
+class Dispatcher(object):
+    # A type dispatcher with a cheap call path and lazy resolution.
+    #
+    # Implementations are cached by the exact types of the arguments, so
+    # that--after the first call with a given combination of types--dispatching
+    # costs a single `dict` lookup instead of a walk over the signatures and
+    # the MROs of the argument types.  `Dispatcher.add` (and, through it,
+    # `register`) clears the cache.
+    #
+    # Registering an implementation only records it.  The signatures are
+    # ordered by a `multipledispatch.Dispatcher`, which is imported and built
+    # the first time an inexact signature needs to be resolved.
+    #
+    # Like `multipledispatch`'s dispatchers, every instance's `__doc__` is
+    # made from the docstrings of its implementations, so this class doesn't
+    # have a docstring of its own.
+
+    __slots__ = ("__name__", "name", "doc", "funcs", "_cache", "_dispatcher")
+
+    def __init__(self, name, doc=None):
+        self.name = self.__name__ = name
+        self.doc = doc
+        self.funcs = {}
+        self._cache = {}
+        self._dispatcher = None
+
+    def add(self, signature, func):
+        """Add an implementation for arguments of the types in `signature`.
+
+        Tuples of types in `signature` register `func` for each of their
+        elements.
+        """
+        signature = tuple(signature)
+
+        if any(isinstance(typ, tuple) for typ in signature):
+            expanded = (typ if isinstance(typ, tuple) else (typ,) for typ in signature)
+            for typs in product(*expanded):
+                self.add(typs, func)
+            return
+
+        if not all(isinstance(typ, type) for typ in signature):
+            raise TypeError(
+                f"Tried to dispatch on non-type in signature {signature} of "
+                f"{self.name}"
+            )
+
+        self.funcs[signature] = func
+        self._cache.clear()
+        self._dispatcher = None
+
+    def register(self, *types):
+        """Register the decorated function for arguments of `types`."""
+
+        def _(func):
+            self.add(types, func)
+            return func
+
+        return _
+
+    @property
+    def dispatcher(self):
+        """The `multipledispatch.Dispatcher` used to order the signatures."""
+        if self._dispatcher is None:
+            from multipledispatch import Dispatcher as _Dispatcher
+
+            dispatcher = _Dispatcher(self.name, doc=self.doc)
+            for signature, func in self.funcs.items():
+                dispatcher.add(signature, func)
+            self._dispatcher = dispatcher
+
+        return self._dispatcher
+
+    @property
+    def __doc__(self):
+        return self.dispatcher.__doc__
+
+    @property
+    def ordering(self):
+        return self.dispatcher.ordering
+
+    def dispatch(self, *types):
+        """Return the implementation for arguments of `types`, or `None`."""
+        if types in self.funcs:
+            return self.funcs[types]
+
+        return self.dispatcher.dispatch(*types)
+
+    def dispatch_iter(self, *types):
+        return self.dispatcher.dispatch_iter(*types)
+
+    def resolve(self, types):
+        """Return the implementation that would be called for arguments of `types`.
+
+        Raises a `NotImplementedError` when no implementation matches.
+        """
+        try:
+            return self._cache[types]
+        except KeyError:
+            func = self.dispatch(*types)
+            if func is None:
+                raise NotImplementedError(
+                    f"Could not find signature for {self.name}: "
+                    f"<{', '.join(typ.__name__ for typ in types)}>"
+                )
+            self._cache[types] = func
+            return func
+
+    def __call__(self, *args, **kwargs):
+        # Building the key without `map` is noticeably cheaper for the
+        # arities used in this package.
+        n = len(args)
+        if n == 2:
+            types = (type(args[0]), type(args[1]))
+        elif n == 3:
+            types = (type(args[0]), type(args[1]), type(args[2]))
+        else:
+            types = tuple(map(type, args))
+
+        try:
+            func = self._cache[types]
+        except KeyError:
+            func = self.resolve(types)
+
+        try:
+            return func(*args, **kwargs)
+        except NotImplementedError as e:
+            from multipledispatch import MDNotImplementedError
+
+            if not isinstance(e, MDNotImplementedError):
+                raise
+
+        # Try the next-best implementations, like `multipledispatch` does
+        for func in islice(self.dispatch_iter(*types), 1, None):
+            try:
+                return func(*args, **kwargs)
+            except MDNotImplementedError:
+                pass
+
+        raise NotImplementedError(
+            f"Matching functions for {self.name}: "
+            f"<{', '.join(typ.__name__ for typ in types)}> found, but none "
+            "completed successfully"
+        )
+
+    def __repr__(self):
+        return f"<dispatched {self.name}>"
+
+
+def dispatch(*types, **kwargs):
+    """Register the decorated function with the `Dispatcher` of the same name.
+
+    This is `multipledispatch.dispatch` for module-level functions, except
+    that the dispatchers it creates are `unification.dispatch.Dispatcher`
+    instances.
+    """
+    ns = kwargs.get("namespace", namespace)
+
+    def _df(func):
+        name = func.__name__
+
+        if name not in ns:
+            ns[name] = Dispatcher(name)
+        dispatcher = ns[name]
+
+        dispatcher.add(types, func)
+        return dispatcher
+
+    return _df
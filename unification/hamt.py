@@ -0,0 +1,275 @@
+from collections.abc import Mapping
+
+from .core import assoc, compact, project, reify
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 32) - 1
+
+
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+
+def _bit_index(bitmap, bit):
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+class _Leaf(object):
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, h, key, value):
+        self.hash = h
+        self.key = key
+        self.value = value
+
+
+class _CollisionNode(object):
+    """A node holding leaves whose (truncated) hashes are all identical."""
+
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, h, leaves):
+        self.hash = h
+        self.leaves = leaves
+
+
+class _BitmapNode(object):
+    """A trie node with up to `_WIDTH` children addressed by a bitmap."""
+
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap, children):
+        self.bitmap = bitmap
+        self.children = children
+
+
+_empty_node = _BitmapNode(0, ())
+
+
+def _merge(shift, node, leaf):
+    """Create the smallest sub-trie holding a leaf (or collision node) and a leaf."""
+    if node.hash == leaf.hash:
+        leaves = node.leaves if type(node) is _CollisionNode else (node,)
+        return _CollisionNode(node.hash, leaves + (leaf,))
+
+    bit_a = 1 << ((node.hash >> shift) & _MASK)
+    bit_b = 1 << ((leaf.hash >> shift) & _MASK)
+
+    if bit_a == bit_b:
+        return _BitmapNode(bit_a, (_merge(shift + _BITS, node, leaf),))
+
+    if bit_a < bit_b:
+        return _BitmapNode(bit_a | bit_b, (node, leaf))
+
+    return _BitmapNode(bit_a | bit_b, (leaf, node))
+
+
+def _lookup(node, h, key, default):
+    shift = 0
+    while True:
+        if type(node) is _BitmapNode:
+            bit = 1 << ((h >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return default
+            node = node.children[_bit_index(node.bitmap, bit)]
+            shift += _BITS
+        elif type(node) is _Leaf:
+            if node.key is key or node.key == key:
+                return node.value
+            return default
+        else:
+            for leaf in node.leaves:
+                if leaf.key is key or leaf.key == key:
+                    return leaf.value
+            return default
+
+
+def _insert(node, shift, leaf):
+    """Return a copy of `node` containing `leaf` and whether a key was added."""
+    if type(node) is _BitmapNode:
+        bit = 1 << ((leaf.hash >> shift) & _MASK)
+        idx = _bit_index(node.bitmap, bit)
+        children = node.children
+
+        if not node.bitmap & bit:
+            children = children[:idx] + (leaf,) + children[idx:]
+            return _BitmapNode(node.bitmap | bit, children), True
+
+        new_child, added = _insert(children[idx], shift + _BITS, leaf)
+        children = children[:idx] + (new_child,) + children[idx + 1 :]
+        return _BitmapNode(node.bitmap, children), added
+
+    if type(node) is _Leaf:
+        if node.key is leaf.key or node.key == leaf.key:
+            return leaf, False
+        return _merge(shift, node, leaf), True
+
+    if node.hash != leaf.hash:
+        return _merge(shift, node, leaf), True
+
+    for i, old_leaf in enumerate(node.leaves):
+        if old_leaf.key is leaf.key or old_leaf.key == leaf.key:
+            leaves = node.leaves[:i] + (leaf,) + node.leaves[i + 1 :]
+            return _CollisionNode(node.hash, leaves), False
+
+    return _CollisionNode(node.hash, node.leaves + (leaf,)), True
+
+
+def _remove(node, shift, h, key):
+    """Return a copy of `node` without `key` (or `node` itself if it's absent).
+
+    `None` is returned when the resulting node would be empty.
+    """
+    if type(node) is _BitmapNode:
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return node
+
+        idx = _bit_index(node.bitmap, bit)
+        child = node.children[idx]
+        new_child = _remove(child, shift + _BITS, h, key)
+
+        if new_child is child:
+            return node
+
+        if new_child is None:
+            bitmap = node.bitmap & ~bit
+            if not bitmap:
+                return None
+            children = node.children[:idx] + node.children[idx + 1 :]
+            if len(children) == 1 and type(children[0]) is not _BitmapNode:
+                # Pull lone leaves up so that lookups stay shallow.
+                return children[0]
+            return _BitmapNode(bitmap, children)
+
+        if len(node.children) == 1 and type(new_child) is not _BitmapNode:
+            return new_child
+
+        children = node.children[:idx] + (new_child,) + node.children[idx + 1 :]
+        return _BitmapNode(node.bitmap, children)
+
+    if type(node) is _Leaf:
+        if node.key is key or node.key == key:
+            return None
+        return node
+
+    for i, leaf in enumerate(node.leaves):
+        if leaf.key is key or leaf.key == key:
+            leaves = node.leaves[:i] + node.leaves[i + 1 :]
+            if len(leaves) == 1:
+                return leaves[0]
+            return _CollisionNode(node.hash, leaves)
+
+    return node
+
+
+def _iter_leaves(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is _BitmapNode:
+            stack.extend(reversed(node.children))
+        elif type(node) is _Leaf:
+            yield node
+        else:
+            yield from node.leaves
+
+
+_missing = object()
+
+
+class HAMTMap(Mapping):
+    """A persistent mapping implemented as a hash array mapped trie.
+
+    Updates return new maps that share most of their structure with the
+    original, so adding a binding costs ``O(log n)`` time and memory instead
+    of the ``O(n)`` copy that `assoc` performs on a `dict`.
+
+    >>> x, y = var('x'), var('y')
+    >>> s = HAMTMap({x: y})
+    >>> unify(y, 1, s)[x]
+    ~y
+    >>> reify(x, unify(y, 1, s))
+    1
+    >>> y in s
+    False
+    """
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, *args, **kwargs):
+        root, n = _empty_node, 0
+        for key, value in dict(*args, **kwargs).items():
+            root, added = _insert(root, 0, _Leaf(_hash(key), key, value))
+            n += added
+        self._root = root
+        self._len = n
+
+    @classmethod
+    def _from_root(cls, root, n):
+        res = object.__new__(cls)
+        res._root = root
+        res._len = n
+        return res
+
+    def set(self, key, value):
+        """Return a new map in which `key` is bound to `value`."""
+        root, added = _insert(self._root, 0, _Leaf(_hash(key), key, value))
+        return self._from_root(root, self._len + added)
+
+    def delete(self, key):
+        """Return a new map without `key`."""
+        root = _remove(self._root, 0, _hash(key), key)
+
+        if root is self._root:
+            raise KeyError(key)
+
+        if root is None:
+            root = _empty_node
+
+        return self._from_root(root, self._len - 1)
+
+    def copy(self):
+        return self
+
+    def __getitem__(self, key):
+        res = _lookup(self._root, _hash(key), key, _missing)
+        if res is _missing:
+            raise KeyError(key)
+        return res
+
+    def get(self, key, default=None):
+        return _lookup(self._root, _hash(key), key, default)
+
+    def __contains__(self, key):
+        return _lookup(self._root, _hash(key), key, _missing) is not _missing
+
+    def __iter__(self):
+        for leaf in _iter_leaves(self._root):
+            yield leaf.key
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        items = ", ".join(
+            f"{leaf.key!r}: {leaf.value!r}" for leaf in _iter_leaves(self._root)
+        )
+        return f"{type(self).__name__}({{{items}}})"
+
+
+@assoc.register(HAMTMap, object, object)
+def assoc_HAMTMap(s, u, v):
+    return s.set(u, v)
+
+
+@compact.register(HAMTMap)
+def compact_HAMTMap(s):
+    return HAMTMap({k: reify(v, s) for k, v in s.items()})
+
+
+@project.register(HAMTMap, object)
+def project_HAMTMap(s, lvars):
+    return HAMTMap({lv: reify(lv, s) for lv in lvars if lv in s})
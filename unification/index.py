@@ -0,0 +1,300 @@
+from itertools import repeat
+
+from .core import _atom_types, _unify, unify
+from .more import _unify_object
+from .variable import isvar
+
+# The key of logic variables, and of any other terms that the index can't
+# discriminate (e.g. objects with their own `_unify` implementations).
+_any = object()
+
+_sequence_types = (tuple, list)
+
+
+def _key(t):
+    if type(t) in _sequence_types:
+        return (type(t), len(t))
+    if isvar(t):
+        return _any
+    if type(t) in _atom_types:
+        return t
+    if _unify.resolve((type(t), type(t), dict)) is _unify_object:
+        # Objects of `unifiable` classes only unify with objects of the same
+        # type, but their attributes aren't indexed.
+        return type(t)
+    return _any
+
+
+def _first(entry):
+    return entry[0]
+
+
+def _arity(key):
+    return key[1] if type(key) is tuple else 0
+
+
+def _flatten(term):
+    """Return the keys of `term` in pre-order and the sizes of their subterms."""
+    keys = []
+    stack = [term]
+    while stack:
+        t = stack.pop()
+        key = _key(t)
+        keys.append(key)
+        if type(key) is tuple:
+            stack.extend(reversed(t))
+
+    sizes = [1] * len(keys)
+    for i in range(len(keys) - 1, -1, -1):
+        j = i + 1
+        for _ in range(_arity(keys[i])):
+            j += sizes[j]
+        sizes[i] = j - i
+
+    return keys, sizes
+
+
+class _Node(object):
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children = {}
+        self.values = []
+
+
+class DiscriminationTree(object):
+    """An index of terms that finds the stored terms that may unify with a term.
+
+    The terms are stored in a trie keyed by their pre-order sequence of
+    symbols, i.e. the types and lengths of tuples and lists, the values of
+    atoms like numbers and strings, the types of objects of `unifiable`
+    classes, and a wildcard for logic variables and any other terms.  A query
+    only follows the branches whose symbols agree with the query term, so the
+    candidates it returns are a superset of the stored terms that unify with
+    it, and usually a much smaller one than the set of all stored terms.  The
+    candidates still need to be unified with the query term.
+
+    >>> x = var('x')
+    >>> tree = DiscriminationTree()
+    >>> tree.add((1, x), 'a')
+    >>> tree.add((2, x), 'b')
+    >>> tree.add(x, 'c')
+    >>> sorted(tree.candidates((1, 3)))
+    ['a', 'c']
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+
+    def add(self, term, value):
+        """Store `value` under `term`."""
+        node = self.root
+        for key in _flatten(term)[0]:
+            try:
+                node = node.children[key]
+            except KeyError:
+                child = node.children[key] = _Node()
+                node = child
+
+        node.values.append(value)
+        self.size += 1
+
+    def remove(self, term, value):
+        """Remove a `value` stored under `term`.
+
+        Raises a `KeyError` when there's no such value.
+        """
+        keys = _flatten(term)[0]
+        path = self._path(term, keys)
+
+        values = path[-1].values
+        for i, v in enumerate(values):
+            if v is value or v == value:
+                del values[i]
+                break
+        else:
+            raise KeyError(term)
+
+        self.size -= 1
+
+        # Remove the nodes that no longer lead to any values
+        for key, parent, node in zip(reversed(keys), path[-2::-1], path[:0:-1]):
+            if node.values or node.children:
+                break
+            del parent.children[key]
+
+    def _path(self, term, keys):
+        """Return the nodes along the `keys` of `term`."""
+        path = [self.root]
+        for key in keys:
+            try:
+                path.append(path[-1].children[key])
+            except KeyError:
+                raise KeyError(term)
+        return path
+
+    def candidates(self, term):
+        """Generate the values stored under terms that may unify with `term`."""
+        keys, sizes = _flatten(term)
+        n = len(keys)
+
+        # The stack holds `(node, pos)` pairs and generators of them, so that
+        # the stored subterms that a query variable skips are visited lazily.
+        stack = [(self.root, 0)]
+        while stack:
+            entry = stack[-1]
+            if type(entry) is tuple:
+                stack.pop()
+            else:
+                entry = next(entry, None)
+                if entry is None:
+                    stack.pop()
+                    continue
+            node, pos = entry
+
+            if pos == n:
+                yield from node.values
+                continue
+
+            key = keys[pos]
+            next_pos = pos + sizes[pos]
+
+            if key is _any:
+                # Any stored subterm could unify with this one
+                stack.append(zip(self._skip(node, 1), repeat(next_pos)))
+                continue
+
+            any_node = node.children.get(_any)
+            if any_node is not None:
+                stack.append((any_node, next_pos))
+
+            next_node = node.children.get(key)
+            if next_node is not None:
+                stack.append((next_node, pos + 1))
+
+    def _skip(self, node, n):
+        """Generate the nodes that are reached by skipping `n` stored terms."""
+        stack = [(node, n)]
+        while stack:
+            node, n = stack.pop()
+            for key, child in node.children.items():
+                remaining = n - 1 + _arity(key)
+                if remaining == 0:
+                    yield child
+                else:
+                    stack.append((child, remaining))
+
+    def __len__(self):
+        return self.size
+
+
+class PatternIndex(object):
+    """A collection of patterns that finds the ones that unify with a term.
+
+    `PatternIndex.matches` is equivalent to calling `unify(pattern, term)`
+    for each pattern, but only the patterns that a `DiscriminationTree`
+    can't rule out are unified with the term.  Since the candidates are
+    unified with `unify`, patterns can contain any terms that `_unify`
+    supports, e.g. objects of `unifiable` classes.
+
+    >>> x, y = var('x'), var('y')
+    >>> index = PatternIndex()
+    >>> index.add(('cpu', x), 'cpu-alert')
+    >>> index.add((y, 100), 'full-alert')
+    >>> index.add(('disk', x), 'disk-alert')
+    >>> list(index.matches(('cpu', 100)))
+    [('cpu-alert', {~x: 100}), ('full-alert', {~y: 'cpu'})]
+    """
+
+    def __init__(self):
+        self._tree = DiscriminationTree()
+        self._count = 0
+
+    def add(self, pattern, payload):
+        """Add `pattern` with `payload`."""
+        self._tree.add(pattern, (self._count, pattern, payload))
+        self._count += 1
+
+    def remove(self, pattern, payload):
+        """Remove a `pattern` that was added with `payload`.
+
+        Raises a `KeyError` when there's no such pattern.
+        """
+        node = self._tree._path(pattern, _flatten(pattern)[0])[-1]
+        for entry in node.values:
+            _, p, v = entry
+            if (p is pattern or p == pattern) and (v is payload or v == payload):
+                self._tree.remove(pattern, entry)
+                return
+
+        raise KeyError(pattern)
+
+    def matches(self, term):
+        """Generate the payloads of the patterns that unify with `term`.
+
+        `(payload, substitution)` pairs are generated in the order in which
+        the patterns were added.
+        """
+        for _, pattern, payload in sorted(self._tree.candidates(term), key=_first):
+            s = unify(pattern, term, {})
+            if s is not False:
+                yield payload, s
+
+    def __len__(self):
+        return len(self._tree)
+
+
+class TermStore(object):
+    """A collection of terms that finds the ones that unify with a pattern.
+
+    `TermStore.find` is equivalent to calling `unify(pattern, term)` for each
+    stored term, but only the terms that a `DiscriminationTree` can't rule out
+    are unified with the pattern.  The logic variables of the pattern don't
+    constrain the terms that are considered, so the more of the pattern is
+    ground, the fewer terms are unified with it.
+
+    The store is a multiset: a term that's added twice is found twice.
+
+    >>> x = var('x')
+    >>> store = TermStore([('edge', 1, 2), ('edge', 1, 3), ('edge', 2, 3)])
+    >>> sorted(s[x] for s in store.find(('edge', 1, x)))
+    [2, 3]
+    """
+
+    def __init__(self, terms=()):
+        self._tree = DiscriminationTree()
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        """Add `term` to the store."""
+        self._tree.add(term, term)
+
+    def remove(self, term):
+        """Remove a `term` from the store.
+
+        Raises a `KeyError` when there's no such term.
+        """
+        self._tree.remove(term, term)
+
+    def find(self, pattern, limit=None):
+        """Generate the substitutions that unify `pattern` with the stored terms.
+
+        The substitutions are generated lazily, in no particular order, and at
+        most `limit` of them are generated when it's given.
+        """
+        if limit is not None and limit <= 0:
+            return
+
+        n = 0
+        for term in self._tree.candidates(pattern):
+            s = unify(pattern, term, {})
+            if s is not False:
+                yield s
+                n += 1
+                if n == limit:
+                    return
+
+    def __len__(self):
+        return len(self._tree)
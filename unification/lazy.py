@@ -0,0 +1,125 @@
+from collections.abc import Mapping, Sequence
+from functools import partial
+
+from .core import _reify, _reify_Iterable_ctor, reify, walk
+from .dispatch import dispatch
+from .more import _reify_object
+
+_missing = object()
+
+
+class LazyTerm(object):
+    """A read-only view of a term that's reified as it's accessed.
+
+    The subterms of a `LazyTerm` are walked and reified only when they're
+    accessed, and compound subterms are returned as `LazyTerm`s, too.  The
+    first call to `materialize` fully reifies the term and caches the result.
+    """
+
+    __slots__ = ("_term", "_s", "_children", "_value")
+
+    def __init__(self, term, s):
+        object.__setattr__(self, "_term", term)
+        object.__setattr__(self, "_s", s)
+        object.__setattr__(self, "_children", {})
+        object.__setattr__(self, "_value", _missing)
+
+    def _child(self, key, child):
+        try:
+            return self._children[key]
+        except KeyError:
+            res = self._children[key] = reify_lazy(child, self._s)
+            return res
+
+    def materialize(self):
+        """Return the fully reified term."""
+        if self._value is _missing:
+            object.__setattr__(self, "_value", reify(self._term, self._s))
+        return self._value
+
+    def __eq__(self, other):
+        if isinstance(other, LazyTerm):
+            other = other.materialize()
+        return self.materialize() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._term!r})"
+
+
+class LazySequence(LazyTerm, Sequence):
+    """A lazily reified `tuple` or `list`."""
+
+    __slots__ = ()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self._term)
+        return self._child(i, self._term[i])
+
+    def __len__(self):
+        return len(self._term)
+
+
+class LazyMapping(LazyTerm, Mapping):
+    """A lazily reified `dict`.
+
+    Only the values are reified lazily; the keys are used as they are.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return self._child(key, self._term[key])
+
+    def __iter__(self):
+        return iter(self._term)
+
+    def __len__(self):
+        return len(self._term)
+
+
+class LazyObject(LazyTerm):
+    """A lazily reified object of a `unifiable` class."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return self._child(name, getattr(self._term, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+
+@dispatch(object, Mapping)
+def reify_lazy(term, s):
+    """Reify `term` with `s` as it's accessed.
+
+    Tuples, lists, `dict`s and objects of `unifiable` classes are returned as
+    read-only `LazyTerm` views; any other term is reified right away.
+
+    >>> x, y = var('x'), var('y')
+    >>> t = reify_lazy({'a': [x, 2], 'b': y}, {x: 1, y: (3, x)})
+    >>> t['a'][0]
+    1
+    >>> t.materialize()
+    {'a': [1, 2], 'b': (3, 1)}
+    """
+    term = walk(term, s)
+    impl = _reify.resolve((type(term), type(s)))
+
+    if type(impl) is partial and impl.func is _reify_Iterable_ctor:
+        if isinstance(term, (tuple, list)):
+            return LazySequence(term, s)
+        elif isinstance(term, dict):
+            return LazyMapping(term, s)
+    elif impl is _reify_object:
+        return LazyObject(term, s)
+
+    return reify(term, s)
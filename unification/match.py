@@ -1,37 +1,167 @@
-from toolz import first, groupby
+from collections import OrderedDict
 
-from .core import reify, unify
+from .core import _atom_types, reify, unify
+from .index import DiscriminationTree
 from .utils import _toposort, freeze
 from .variable import isvar
 
+_missing = object()
+
+
+def _is_ground_signature(signature):
+    """Check if a signature consists of tuples of atoms without variables."""
+    stack = [signature]
+    while stack:
+        t = stack.pop()
+        if type(t) is tuple:
+            stack.extend(t)
+        elif type(t) not in _atom_types or isvar(t):
+            return False
+    return True
+
+
+def _is_hashed_by_value(frozen_args):
+    """Check if frozen arguments only contain objects that are hashed by value.
+
+    Objects that are hashed by identity can be changed in-place without
+    changing their hash, so the signature they resolved to (if any) can't be
+    reused for them later on.
+    """
+    stack = [frozen_args]
+    while stack:
+        t = stack.pop()
+        if type(t) is tuple:
+            stack.extend(t)
+        elif type(t).__hash__ is object.__hash__ and not isvar(t):
+            return False
+    return True
+
+
+class NoMatchError(NotImplementedError):
+    """Raised when no signature of a `Dispatcher` matches the arguments.
+
+    The message is only formatted when it's needed, since it lists all of
+    the signatures.
+    """
+
+    def __init__(self, signatures, args):
+        super().__init__(signatures, args)
+        self.signatures = signatures
+        self.inputs = args
+
+    def __str__(self):
+        return (
+            f"No match found. \nKnown matches: {self.signatures} "
+            f"\nInput: {self.inputs}"
+        )
+
 
 class Dispatcher(object):
-    def __init__(self, name):
+    def __init__(self, name, cache_size=256, default=None):
         self.name = name
         self.funcs = dict()
-        self.ordering = []
+        # Called with the arguments that don't match any signature
+        self.default = default
+        # An index of the signatures, so that `resolve` only needs to unify
+        # with the ones that can match
+        self._index = DiscriminationTree()
+        self._ordering = None
+        self._priorities = None
+        # The functions of the ground signatures, which take precedence over
+        # any other signatures that match the same arguments
+        self._ground = dict()
+        # The signatures that were resolved for the most recent arguments, or
+        # `None` for the arguments that didn't match any.  Arguments that
+        # could be changed to match another signature aren't cached.
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    @property
+    def ordering(self):
+        """The signatures, from the most to the least specific."""
+        self._update_ordering()
+        return self._ordering
+
+    def _update_ordering(self):
+        """Order the signatures and their priorities, unless they're up-to-date."""
+        if self._ordering is None:
+            self._ordering = ordering(self.funcs)
+            self._priorities = {sig: i for i, sig in enumerate(self._ordering)}
 
     def add(self, signature, func):
-        self.funcs[freeze(signature)] = func
-        self.ordering = ordering(self.funcs)
+        signature = freeze(signature)
+        if signature not in self.funcs:
+            self._index.add(signature, signature)
+        self.funcs[signature] = func
+        if _is_ground_signature(signature):
+            self._ground[signature] = func
+        self._ordering = None
+        self._cache.clear()
 
     def __call__(self, *args, **kwargs):
-        func, s = self.resolve(args)
+        res = self._lookup(args)
+        if res is None:
+            return self._no_match(args, kwargs)
+        func, s = res
         return func(*args, **kwargs)
 
     def resolve(self, args):
-        n = len(args)
+        res = self._lookup(args)
+        if res is None:
+            raise NoMatchError(self.ordering, args)
+        return res
+
+    def _no_match(self, args, kwargs):
+        if self.default is None:
+            raise NoMatchError(self.ordering, args)
+        return self.default(*args, **kwargs)
+
+    def _lookup(self, args):
+        """Return the function and substitution for `args`, or `None`."""
         frozen_args = freeze(args)
-        for signature in self.ordering:
-            if len(signature) != n:
-                continue
+
+        try:
+            func = self._ground.get(frozen_args, _missing)
+        except TypeError:
+            # Unhashable arguments can't be looked up or cached
+            signature, s = self._resolve(frozen_args)
+        else:
+            if func is not _missing:
+                return func, {}
+
+            signature = self._cache.get(frozen_args, _missing)
+            if signature is _missing:
+                signature, s = self._resolve(frozen_args)
+
+                if _is_hashed_by_value(frozen_args):
+                    self._cache[frozen_args] = signature
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(frozen_args)
+                # Only the signature is cached, since equal arguments (e.g.
+                # `1` and `1.0`) can still bind variables to different values.
+                if signature is not None:
+                    s = unify(frozen_args, signature)
+
+        if signature is None:
+            return None
+        return self.funcs[signature], s
+
+    def _resolve(self, frozen_args):
+        """Find the most specific signature that matches `frozen_args`.
+
+        Returns `(None, False)` when there's no such signature.
+        """
+        self._update_ordering()
+        candidates = sorted(
+            self._index.candidates(frozen_args), key=self._priorities.__getitem__
+        )
+        for signature in candidates:
             s = unify(frozen_args, signature)
             if s is not False:
-                result = self.funcs[signature]
-                return result, s
-        raise NotImplementedError(
-            f"No match found. \nKnown matches: {self.ordering} \nInput: {args}"
-        )
+                return signature, s
+        return None, False
 
     def register(self, *signature):
         def _(func):
@@ -64,7 +194,10 @@ class VarDispatcher(Dispatcher):
     """
 
     def __call__(self, *args, **kwargs):
-        func, s = self.resolve(args)
+        res = self._lookup(args)
+        if res is None:
+            return self._no_match(args, kwargs)
+        func, s = res
         d = dict((k.token, v) for k, v in s.items())
         return func(**d)
 
@@ -122,8 +255,21 @@ def ordering(signatures):
 
     Topological sort of edges as given by ``edge`` and ``supercedes``
     """
+    from toolz import first, groupby
+
     signatures = list(map(tuple, signatures))
-    edges = [(a, b) for a in signatures for b in signatures if edge(a, b)]
+
+    # Only signatures that unify can supercede each other
+    index = DiscriminationTree()
+    for i, b in enumerate(signatures):
+        index.add(b, i)
+
+    edges = [
+        (a, signatures[i])
+        for a in signatures
+        for i in sorted(index.candidates(a))
+        if edge(a, signatures[i])
+    ]
     edges = groupby(first, edges)
     for s in signatures:
         if s not in edges:
@@ -1,6 +1,6 @@
 from collections.abc import Mapping
 
-from .core import _reify, _unify, construction_sentinel
+from .core import ReifyChildren, UnifyPairs, _reify, _unify
 
 
 def unifiable(cls):
@@ -29,6 +29,7 @@ def unifiable(cls):
     return cls
 
 
+@ReifyChildren
 def _reify_object(o, s):
     """Reify a Python object with a substitution.
 
@@ -53,35 +54,31 @@ def _reify_object(o, s):
 
 
 def _reify_object_dict(o, s):
-    obj = type(o).__new__(type(o))
+    keys = list(o.__dict__)
+    values = list(o.__dict__.values())
 
-    d = yield _reify(o.__dict__, s)
+    def ctor(new_values):
+        obj = type(o).__new__(type(o))
+        obj.__dict__.update(zip(keys, new_values))
+        return obj
 
-    yield construction_sentinel
-
-    if d == o.__dict__:
-        yield o
-    else:
-        obj.__dict__.update(d)
-        yield obj
+    return values, ctor
 
 
 def _reify_object_slots(o, s):
     attrs = [getattr(o, attr) for attr in o.__slots__]
-    new_attrs = yield _reify(attrs, s)
-
-    yield construction_sentinel
 
-    if attrs == new_attrs:
-        yield o
-    else:
+    def ctor(new_attrs):
         newobj = object.__new__(type(o))
         for slot, attr in zip(o.__slots__, new_attrs):
             setattr(newobj, slot, attr)
 
-        yield newobj
+        return newobj
+
+    return attrs, ctor
 
 
+@UnifyPairs
 def _unify_object(u, v, s):
     """Unify two Python objects.
 
@@ -101,14 +98,20 @@ def _unify_object(u, v, s):
     {~x: 2}
     """
     if type(u) != type(v):
-        yield False
-        return
+        return False
 
     if hasattr(u, "__slots__"):
-        yield _unify(
-            tuple(getattr(u, slot) for slot in u.__slots__),
-            tuple(getattr(v, slot) for slot in v.__slots__),
-            s,
-        )
-    else:
-        yield _unify(u.__dict__, v.__dict__, s)
+        return [(getattr(u, slot), getattr(v, slot)) for slot in u.__slots__]
+
+    u_dict, v_dict = u.__dict__, v.__dict__
+
+    if len(u_dict) != len(v_dict):
+        return False
+
+    pairs = []
+    for key, uval in u_dict.items():
+        if key not in v_dict:
+            return False
+        pairs.append((uval, v_dict[key]))
+
+    return pairs
@@ -0,0 +1,90 @@
+from collections.abc import Mapping
+
+from .core import assoc
+from .variable import Var
+
+# The number of bindings beyond which a `SmallMap` is promoted to a `dict`.
+max_small_size = 8
+
+
+def _index(items, key):
+    for i in range(0, len(items), 2):
+        if items[i] is key:
+            return i
+
+    # `Var`s are interned, so equal `Var`s are always identical.
+    if type(key) is not Var:
+        for i in range(0, len(items), 2):
+            if items[i] == key:
+                return i
+
+    return -1
+
+
+class SmallMap(Mapping):
+    """A compact, immutable substitution for a handful of bindings.
+
+    The bindings are stored in a single flat tuple and looked up with a linear
+    scan, which is smaller than a `dict` and just as fast for a few entries.
+    Once a `SmallMap` holds `max_small_size` bindings, `assoc` promotes it to
+    a `dict`.
+
+    >>> x, y = var('x'), var('y')
+    >>> unify((x, y), (1, 2), SmallMap())
+    SmallMap({~x: 1, ~y: 2})
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, *args, **kwargs):
+        items = []
+        for key, value in dict(*args, **kwargs).items():
+            items.append(key)
+            items.append(value)
+        self._items = tuple(items)
+
+    @classmethod
+    def _from_items(cls, items):
+        res = object.__new__(cls)
+        res._items = items
+        return res
+
+    def copy(self):
+        return self
+
+    def __getitem__(self, key):
+        i = _index(self._items, key)
+        if i < 0:
+            raise KeyError(key)
+        return self._items[i + 1]
+
+    def __contains__(self, key):
+        return _index(self._items, key) >= 0
+
+    def __iter__(self):
+        return iter(self._items[::2])
+
+    def __len__(self):
+        return len(self._items) // 2
+
+    def _pairs(self):
+        return zip(self._items[::2], self._items[1::2])
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self._pairs())!r})"
+
+
+@assoc.register(SmallMap, object, object)
+def assoc_SmallMap(s, u, v):
+    items = s._items
+    i = _index(items, u)
+
+    if i >= 0:
+        return SmallMap._from_items(items[: i + 1] + (v,) + items[i + 2 :])
+
+    if len(items) // 2 >= max_small_size:
+        res = dict(s._pairs())
+        res[u] = v
+        return res
+
+    return SmallMap._from_items(items + (u, v))
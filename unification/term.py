@@ -0,0 +1,120 @@
+import weakref
+from collections.abc import Mapping
+
+from .core import ReifyChildren, UnifyPairs, _reify, _unify, isground, unground_lvars
+from .variable import isvar
+
+
+def _free_vars(o):
+    if isinstance(o, Term):
+        return o.free_vars
+    if isvar(o):
+        return {o}
+    return unground_lvars(o, {})
+
+
+def _intern_key(o):
+    """Pair `o`, and any elements of a tuple or frozenset `o`, with their types.
+
+    The types are part of the key, because, e.g. `1 == 1.0 == True`.
+    """
+    if type(o) is tuple:
+        return (tuple, tuple(map(_intern_key, o)))
+    if type(o) is frozenset:
+        return (frozenset, frozenset(map(_intern_key, o)))
+    return (type(o), o)
+
+
+class Term(object):
+    """An immutable, hash-consed compound term.
+
+    Structurally equal terms are the same object, so comparing two terms--and
+    unifying a term with itself--doesn't traverse them.  Each term also
+    carries its hash, its node count (`size`) and its free logic variables
+    (`free_vars`), which are computed once, when it's constructed.  As a
+    result, `isground` and `unground_lvars` don't traverse a term when it has
+    no free variables or the substitution is empty.
+
+    The operator and arguments of a term must be hashable.  Compound arguments
+    should be `Term`s themselves, so that they're shared too.
+
+    >>> x = var('x')
+    >>> Term('f', 1, Term('g', x)) is Term('f', 1, Term('g', x))
+    True
+    >>> unify(Term('f', 1, Term('g', x)), Term('f', 1, Term('g', 2)))
+    {~x: 2}
+    >>> Term('f', 1, Term('g', x)).free_vars
+    frozenset({~x})
+    """
+
+    __slots__ = ("op", "args", "size", "free_vars", "_hash", "__weakref__")
+    _refs = weakref.WeakValueDictionary()
+
+    def __new__(cls, op, *args):
+        key = (cls, _intern_key(op), tuple(map(_intern_key, args)))
+
+        obj = cls._refs.get(key, None)
+
+        if obj is None:
+            obj = object.__new__(cls)
+            obj.op = op
+            obj.args = args
+            obj._hash = hash(key)
+
+            size = 1
+            free_vars = set(_free_vars(op))
+            for a in args:
+                size += a.size if isinstance(a, Term) else 1
+                free_vars |= _free_vars(a)
+
+            obj.size = size
+            obj.free_vars = frozenset(free_vars)
+
+            cls._refs[key] = obj
+
+        return obj
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), (self.op,) + self.args)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(map(repr, (self.op,) + self.args))})"
+
+
+@_unify.register(Term, Term, Mapping)
+@UnifyPairs
+def _unify_Term(u, v, s):
+    if len(u.args) != len(v.args):
+        return False
+    return zip((u.op,) + u.args, (v.op,) + v.args)
+
+
+@_reify.register(Term, Mapping)
+@ReifyChildren
+def _reify_Term(o, s):
+    return (o.op,) + o.args, lambda children: type(o)(*children)
+
+
+@isground.register(Term, Mapping)
+def isground_Term(u, s):
+    if not u.free_vars:
+        return True
+    if len(s) == 0:
+        return False
+    return all(isground(lv, s) for lv in u.free_vars)
+
+
+@unground_lvars.register(Term, Mapping)
+def unground_lvars_Term(u, s):
+    if not u.free_vars:
+        return set()
+    if len(s) == 0:
+        return set(u.free_vars)
+
+    lvars = set()
+    for lv in u.free_vars:
+        lvars |= unground_lvars(lv, s)
+    return lvars
@@ -0,0 +1,98 @@
+from collections.abc import MutableMapping
+
+from .core import assoc, unify
+
+_missing = object()
+
+
+class TrailMap(MutableMapping):
+    """A mutable substitution that records every change in an undo log (trail).
+
+    `assoc` binds directly into a `TrailMap` instead of copying it, which
+    makes it suitable for search-style code that tries many alternatives
+    against one large state.  `checkpoint` marks a position in the trail and
+    `rollback` undoes all the changes made after that position.
+
+    >>> x, y = var('x'), var('y')
+    >>> s = TrailMap({x: 1})
+    >>> cp = s.checkpoint()
+    >>> unify_inplace(y, 2, s)
+    TrailMap({~x: 1, ~y: 2})
+    >>> s.rollback(cp)
+    >>> s
+    TrailMap({~x: 1})
+    """
+
+    __slots__ = ("_bindings", "_trail")
+
+    def __init__(self, *args, **kwargs):
+        self._bindings = dict(*args, **kwargs)
+        self._trail = []
+
+    def checkpoint(self):
+        """Return a marker for the current state of the substitution."""
+        return len(self._trail)
+
+    def rollback(self, checkpoint=0):
+        """Undo all changes made since `checkpoint`."""
+        bindings = self._bindings
+        trail = self._trail
+
+        while len(trail) > checkpoint:
+            key, old_value = trail.pop()
+            if old_value is _missing:
+                del bindings[key]
+            else:
+                bindings[key] = old_value
+
+    def copy(self):
+        return type(self)(self._bindings)
+
+    def __getitem__(self, key):
+        return self._bindings[key]
+
+    def __setitem__(self, key, value):
+        self._trail.append((key, self._bindings.get(key, _missing)))
+        self._bindings[key] = value
+
+    def __delitem__(self, key):
+        old_value = self._bindings.pop(key)
+        self._trail.append((key, old_value))
+
+    def __contains__(self, key):
+        return key in self._bindings
+
+    def __iter__(self):
+        return iter(self._bindings)
+
+    def __len__(self):
+        return len(self._bindings)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._bindings!r})"
+
+
+@assoc.register(TrailMap, object, object)
+def assoc_TrailMap(s, u, v):
+    s[u] = v
+    return s
+
+
+def unify_inplace(u, v, s):
+    """Unify `u` and `v` by binding directly into the `TrailMap` `s`.
+
+    When unification fails, all the bindings it made are rolled back and
+    `False` is returned; otherwise, `s` itself is returned.
+
+    Since `s` is changed in place, `_unify` implementations that backtrack
+    by reusing a substitution after a failed sub-unification can't be used
+    with this function.
+    """
+    checkpoint = s.checkpoint()
+
+    res = unify(u, v, s)
+
+    if res is False:
+        s.rollback(checkpoint)
+
+    return res
@@ -0,0 +1,154 @@
+from collections.abc import Mapping
+from itertools import chain
+
+from .core import assoc, walk
+from .hamt import HAMTMap
+from .variable import isvar
+
+_unbound = object()
+
+
+class UnionFindMap(Mapping):
+    """A substitution that stores aliased logic variables in a union-find forest.
+
+    Logic variables that are unified with each other are merged into a single
+    equivalence class (union by rank) and a class's value, if any, is stored
+    on its root.  Walking a variable finds its root with path compression, so
+    long alias chains are shortened as they're traversed and subsequent walks
+    take near-constant time.
+
+    As a `Mapping`, every non-root variable maps to its parent and every bound
+    root maps to its value.  Path compression can change the parent a
+    variable maps to, but never the term it walks to.
+
+    Binding a variable with `assoc` binds its whole equivalence class.
+
+    The forest is stored in persistent `HAMTMap`s, so a new substitution
+    shares almost all of its structure with the one it extends, and binding
+    a variable costs ``O(log n)`` time and memory instead of a copy of every
+    binding.
+
+    >>> x, y, z = var('x'), var('y'), var('z')
+    >>> s = unify((x, y), (y, z), UnionFindMap())
+    >>> s = unify(z, 1, s)
+    >>> reify((x, y, z), s)
+    (1, 1, 1)
+    """
+
+    __slots__ = ("_parent", "_rank", "_values")
+
+    def __init__(self, *args, **kwargs):
+        self._parent = HAMTMap()
+        self._rank = HAMTMap()
+        self._values = HAMTMap()
+        for u, v in dict(*args, **kwargs).items():
+            self._bind(u, v)
+
+    def find(self, u):
+        """Find the root of the equivalence class of `u`."""
+        parent = self._parent
+
+        root = u
+        try:
+            while root in parent:
+                root = parent[root]
+        except TypeError:
+            return u
+
+        compressed = parent
+        while u is not root:
+            u_parent = parent[u]
+            if u_parent is not root:
+                compressed = compressed.set(u, root)
+            u = u_parent
+
+        # Compression doesn't change what any variable walks to, so the
+        # substitutions that share the old forest remain valid.
+        self._parent = compressed
+
+        return root
+
+    def walk(self, u):
+        if not isvar(u):
+            return u
+        root = self.find(u)
+        return self._values.get(root, root)
+
+    def _bind(self, u, v):
+        u = self.find(u)
+
+        if not isvar(v):
+            self._values = self._values.set(u, v)
+            return
+
+        v = self.find(v)
+
+        if u == v:
+            return
+
+        # Like a `dict`, the binding for `u` is replaced by `v`'s.
+        values = self._values
+        value = values.get(v, _unbound)
+        if value is not _unbound:
+            values = values.delete(v)
+        if u in values:
+            values = values.delete(u)
+
+        rank = self._rank
+        rank_u = rank.get(u, 0)
+        rank_v = rank.get(v, 0)
+
+        if rank_u > rank_v:
+            u, v = v, u
+        elif rank_u == rank_v:
+            rank = rank.set(v, rank_v + 1)
+
+        self._parent = self._parent.set(u, v)
+        if u in rank:
+            rank = rank.delete(u)
+        self._rank = rank
+
+        if value is not _unbound:
+            values = values.set(v, value)
+        self._values = values
+
+    def copy(self):
+        res = object.__new__(type(self))
+        res._parent = self._parent
+        res._rank = self._rank
+        res._values = self._values
+        return res
+
+    def __getitem__(self, key):
+        try:
+            return self._parent[key]
+        except KeyError:
+            return self._values[key]
+
+    def __contains__(self, key):
+        try:
+            return key in self._parent or key in self._values
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        return chain(self._parent, self._values)
+
+    def __len__(self):
+        return len(self._parent) + len(self._values)
+
+    def __repr__(self):
+        items = ", ".join(f"{k!r}: {v!r}" for k, v in self.items())
+        return f"{type(self).__name__}({{{items}}})"
+
+
+@assoc.register(UnionFindMap, object, object)
+def assoc_UnionFindMap(s, u, v):
+    s = s.copy()
+    s._bind(u, v)
+    return s
+
+
+@walk.register(object, UnionFindMap)
+def walk_UnionFindMap(u, s):
+    return s.walk(u)
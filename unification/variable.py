@@ -1,6 +1,6 @@
 import weakref
 from abc import ABCMeta
-from contextlib import contextmanager, suppress
+from contextlib import contextmanager
 
 _global_logic_variables = set()
 _glv = _global_logic_variables
@@ -8,8 +8,17 @@ _glv = _global_logic_variables
 
 class LVarType(ABCMeta):
     def __instancecheck__(self, o):
-        with suppress(TypeError):
-            return issubclass(type(o), (Var, LVarType)) or o in _glv
+        if issubclass(type(o), (Var, LVarType)):
+            return True
+
+        # Only hash `o` when there are global logic variables to look for.
+        if not _glv:
+            return False
+
+        try:
+            return o in _glv
+        except TypeError:
+            return False
 
 
 class Var(metaclass=LVarType):
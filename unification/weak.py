@@ -0,0 +1,70 @@
+from collections.abc import MutableMapping
+from weakref import WeakKeyDictionary
+
+
+class WeakVarMap(MutableMapping):
+    """A substitution that only holds weak references to its logic variables.
+
+    A binding is dropped as soon as its logic variable is garbage collected,
+    i.e. when it's no longer referenced outside of the substitution's keys.
+    Variables that are referenced by the values of other bindings are kept
+    alive, so only bindings that can't be reached from a live variable are
+    ever dropped.  This prevents the bindings of temporary variables from
+    accumulating in substitutions that are threaded through long-running
+    loops.
+
+    Keys that can't be weakly referenced (e.g. the objects made into logic
+    variables by `variables`) are held normally.
+
+    >>> x = var('x')
+    >>> s = unify((x, var()), (1, 2), WeakVarMap())
+    >>> import gc; _ = gc.collect()
+    >>> s
+    WeakVarMap({~x: 1})
+    """
+
+    __slots__ = ("_weak", "_strong")
+
+    def __init__(self, *args, **kwargs):
+        self._weak = WeakKeyDictionary()
+        self._strong = {}
+        self.update(*args, **kwargs)
+
+    def copy(self):
+        res = object.__new__(type(self))
+        res._weak = self._weak.copy()
+        res._strong = self._strong.copy()
+        return res
+
+    def __getitem__(self, key):
+        try:
+            return self._weak[key]
+        except TypeError:
+            return self._strong[key]
+
+    def __setitem__(self, key, value):
+        try:
+            self._weak[key] = value
+        except TypeError:
+            self._strong[key] = value
+
+    def __delitem__(self, key):
+        try:
+            del self._weak[key]
+        except TypeError:
+            del self._strong[key]
+
+    def __contains__(self, key):
+        # `WeakKeyDictionary.__contains__` returns `False` for keys that
+        # can't be weakly referenced.
+        return key in self._weak or key in self._strong
+
+    def __iter__(self):
+        yield from self._weak
+        yield from self._strong
+
+    def __len__(self):
+        return len(self._weak) + len(self._strong)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"